@@ -0,0 +1,8 @@
+def post_worker_init(worker):
+    """Optionally load models and clients in each worker before it serves requests"""
+    from django.conf import settings
+
+    if settings.WARM_UP_ON_START:
+        from investment_chat_app.clients import warm_up
+
+        warm_up()
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from itertools import count
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """
+    In-process cache of chat answers keyed by query embedding.
+
+    An entry is served when a new query's embedding has cosine similarity of
+    at least ``threshold`` with a cached one *and* retrieval returned exactly
+    the same chunks (ids and file hashes) as when the answer was generated,
+    so re-indexed or removed files never serve stale answers. Entries expire
+    after ``ttl`` seconds and the least recently used are evicted first.
+    """
+
+    def __init__(self, threshold=0.95, max_entries=1000, ttl=3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._ids = count()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "seconds_saved": 0.0}
+
+    @staticmethod
+    def _normalize(embedding):
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def _expire(self, now):
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if now - entry["created"] > self.ttl
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(self, query_embedding, chunk_key):
+        """Return a cached answer for a similar query over the same chunks, or None"""
+        query = self._normalize(query_embedding)
+        with self._lock:
+            self._expire(time.monotonic())
+            candidates = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry["chunk_key"] == chunk_key
+            ]
+            if candidates:
+                similarities = (
+                    np.vstack([e["embedding"] for _, e in candidates]) @ query
+                )
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    key, entry = candidates[best]
+                    self._entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    self.counters["seconds_saved"] += entry["latency"]
+                    logger.info(
+                        f"Semantic answer cache hit (similarity {similarities[best]:.3f}, "
+                        f"saved {entry['latency']:.2f}s): {self._stats_locked()}"
+                    )
+                    return entry["answer"]
+            self.counters["misses"] += 1
+        return None
+
+    def store(self, query_embedding, chunk_key, sources, answer, latency):
+        """Cache an answer generated from the given chunks"""
+        with self._lock:
+            self._entries[next(self._ids)] = {
+                "embedding": self._normalize(query_embedding),
+                "chunk_key": chunk_key,
+                "sources": set(sources),
+                "answer": answer,
+                "latency": latency,
+                "created": time.monotonic(),
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_source(self, source):
+        """Drop every cached answer that was built from chunks of ``source``"""
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if source in e["sources"]]
+            for key in stale:
+                del self._entries[key]
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached answers for {source}")
+
+    def _stats_locked(self):
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "hits": self.counters["hits"],
+            "misses": self.counters["misses"],
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            "seconds_saved": round(self.counters["seconds_saved"], 2),
+        }
+
+    def stats(self):
+        """Snapshot of hit rate and generation time saved"""
+        with self._lock:
+            return self._stats_locked()
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """Return the process-wide SemanticAnswerCache, creating it on first use"""
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                _answer_cache = SemanticAnswerCache(
+                    threshold=settings.ANSWER_CACHE_THRESHOLD,
+                    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+                    ttl=settings.ANSWER_CACHE_TTL,
+                )
+    return _answer_cache
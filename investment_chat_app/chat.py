@@ -0,0 +1,385 @@
+import asyncio
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from django.conf import settings
+
+from investment_chat_app.answer_cache import get_answer_cache
+from investment_chat_app.clients import get_async_openai_client, get_openai_client
+from investment_chat_app.document_inventory import get_document_inventory
+from investment_chat_app.embeddings import get_embedding_service
+from investment_chat_app.lexical_index import get_lexical_index
+from investment_chat_app.utils.context_budget import (
+    count_message_tokens,
+    deduplicate_chunks,
+    get_token_counter,
+    merge_adjacent_chunks,
+    pack_chunks,
+)
+from investment_chat_app.utils.query_analysis import analyze_query, build_where_filter
+from investment_chat_app.vector_store import get_collection
+
+logger = logging.getLogger(__name__)
+
+GPT_MODEL = "gpt-3.5-turbo-16k"
+
+GPT_ERROR_MESSAGE = (
+    "I'm sorry, but I encountered an error while processing your request."
+)
+
+DOCUMENT_QUERY_KEYWORDS = [
+    "what documents",
+    "which reports",
+    "available files",
+    "what files",
+]
+
+
+def is_document_inventory_question(query):
+    """Whether the user is asking which documents are available"""
+    return any(keyword in query.lower() for keyword in DOCUMENT_QUERY_KEYWORDS)
+
+
+def get_documents_context():
+    """Describe every indexed document for availability questions"""
+    return get_document_inventory().prompt_section
+
+
+# Metadata filters tried in order until one returns chunks: everything the
+# question names, then only the companies, then the whole collection
+FILTER_RELAXATION = [("tickers", "years", "form_types"), ("tickers",), ()]
+
+
+def get_relevant_chunks(query, n_results=8, query_embedding=None):
+    """
+    Return the chunks closest to the query as {id, text, metadata} dicts.
+
+    Tickers, years and form types named in the question restrict the search
+    to matching filings, relaxing the filter when nothing matches (for
+    example when chunks were indexed before they carried that metadata).
+    ``query_embedding`` skips encoding the query when the caller already has
+    its vector.
+    """
+    if query_embedding is None:
+        query_embedding = get_embedding_service().encode([query])[0]
+    query_embeddings = [query_embedding.tolist()]
+    filters = analyze_query(query)
+
+    tried = set()
+    for fields in FILTER_RELAXATION:
+        where = build_where_filter(filters, fields)
+        key = repr(where)
+        if key in tried:
+            continue
+        tried.add(key)
+
+        results = get_collection().query(
+            query_embeddings=query_embeddings, n_results=n_results, where=where
+        )
+        if results["ids"][0]:
+            if where:
+                logger.info(f"Retrieved {len(results['ids'][0])} chunks with {where}")
+            break
+
+    chunks = [
+        {"id": chunk_id, "text": doc, "metadata": metadata}
+        for chunk_id, doc, metadata in zip(
+            results["ids"][0], results["documents"][0], results["metadatas"][0]
+        )
+    ]
+    if settings.HYBRID_RETRIEVAL:
+        chunks = fuse_lexical_results(query, chunks, n_results, where)
+    return chunks
+
+
+def fuse_lexical_results(query, vector_chunks, n_results, where=None):
+    """
+    Merge BM25 matches into vector search results by reciprocal rank fusion.
+
+    Exact terms such as "diluted EPS", "Item 7A" or dollar figures that the
+    embedding model misses are found lexically; chunks ranked well by both
+    searches rise to the top.
+    """
+    try:
+        lexical_index = get_lexical_index()
+        lexical_index.sync()
+        lexical_hits = lexical_index.search(query, n_results, where)
+    except Exception as e:
+        logger.error(f"Error searching lexical index: {str(e)}")
+        return vector_chunks
+
+    k = settings.HYBRID_RRF_K
+    scores = {}
+    for rank, chunk in enumerate(vector_chunks):
+        scores[chunk["id"]] = 1 / (k + rank + 1)
+    for rank, (chunk_id, _) in enumerate(lexical_hits):
+        scores[chunk_id] = scores.get(chunk_id, 0.0) + 1 / (k + rank + 1)
+
+    top_ids = sorted(scores, key=scores.get, reverse=True)[:n_results]
+    chunks_by_id = {chunk["id"]: chunk for chunk in vector_chunks}
+    missing = [chunk_id for chunk_id in top_ids if chunk_id not in chunks_by_id]
+    if missing:
+        # Only the lexical-only winners need their text fetched
+        results = get_collection().get(ids=missing, include=["documents", "metadatas"])
+        for chunk_id, doc, metadata in zip(
+            results["ids"], results["documents"], results["metadatas"]
+        ):
+            chunks_by_id[chunk_id] = {"id": chunk_id, "text": doc, "metadata": metadata}
+
+    return [chunks_by_id[chunk_id] for chunk_id in top_ids if chunk_id in chunks_by_id]
+
+
+def format_context(chunks):
+    """Render retrieved chunks as the context block of the prompt"""
+    contexts = []
+    for chunk in chunks:
+        metadata = chunk["metadata"]
+        process_date = metadata.get("processed_date", "Unknown date")
+        page_start = metadata.get("page_start", metadata["page"])
+        page_end = metadata.get("page_end", page_start)
+        pages = (
+            f"Page {page_start}"
+            if page_start == page_end
+            else f"Pages {page_start}-{page_end}"
+        )
+        contexts.append(
+            f"From {metadata['source']} ({pages}, Processed: {process_date}):\n{chunk['text']}\n"
+        )
+    return "\n".join(contexts)
+
+
+def get_relevant_context(query, n_results=8):
+    """Get relevant document chunks based on the query"""
+    try:
+        # If asking about available documents, return all document info
+        if is_document_inventory_question(query):
+            return get_documents_context()
+
+        return assemble_context(get_relevant_chunks(query, n_results))
+    except Exception as e:
+        logger.error(f"Error getting relevant context: {str(e)}")
+        return ""
+
+
+def assemble_context(chunks):
+    """
+    Render retrieved chunks as prompt context within CHAT_CONTEXT_TOKEN_BUDGET.
+
+    Repeated chunks are dropped, neighbouring chunks of the same file are
+    joined without their overlap, and passages are kept best-ranked first
+    until the token budget is spent.
+    """
+    passages = merge_adjacent_chunks(deduplicate_chunks(chunks))
+    packed, tokens = pack_chunks(
+        passages,
+        settings.CHAT_CONTEXT_TOKEN_BUDGET,
+        get_token_counter(GPT_MODEL),
+        lambda passage: format_context([passage]),
+    )
+    logger.info(
+        f"Context: {len(packed)} of {len(passages)} passages "
+        f"({len(chunks)} chunks retrieved), {tokens} tokens"
+    )
+    return format_context(packed)
+
+
+def build_messages(user_message, context):
+    """Build the system and user messages sent to GPT"""
+    system_prompt = """You are a helpful assistant analyzing EDGAR financial documents.
+        Provide detailed, accurate responses based on the context provided.
+        When discussing document availability, refer to the document list in the context.
+        If the information isn't in the context, say so."""
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {
+            "role": "user",
+            "content": f"Context:\n{context}\n\nQuestion: {user_message}\n\nProvide a detailed answer based on the context above:",
+        },
+    ]
+    logger.info(
+        f"Prompt tokens: {count_message_tokens(messages, get_token_counter(GPT_MODEL))}"
+    )
+    return messages
+
+
+def generate_gpt_response(user_message, context):
+    """Generate a response using GPT based on the relevant context"""
+    try:
+        response = get_openai_client().chat.completions.create(
+            model=GPT_MODEL,
+            messages=build_messages(user_message, context),
+            max_tokens=1000,
+            temperature=0.7,
+        )
+
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.error(f"Error generating GPT response: {str(e)}")
+        return GPT_ERROR_MESSAGE
+
+
+def stream_gpt_response(user_message, context):
+    """Yield GPT response text as it is generated; errors propagate to the caller"""
+    stream = get_openai_client().chat.completions.create(
+        model=GPT_MODEL,
+        messages=build_messages(user_message, context),
+        max_tokens=1000,
+        temperature=0.7,
+        stream=True,
+    )
+    for event in stream:
+        if event.choices and event.choices[0].delta.content:
+            yield event.choices[0].delta.content
+
+
+def chunk_cache_key(chunks):
+    """Identify a retrieval result by its chunk ids and the hashes of their files"""
+    return tuple(
+        sorted((chunk["id"], chunk["metadata"].get("file_hash")) for chunk in chunks)
+    )
+
+
+def retrieve_with_cache(user_message):
+    """
+    Retrieve chunks for a question and look for a cached answer over them.
+
+    Returns ``(chunks, probe, cached_answer)``; pass ``probe`` to
+    remember_answer() once a fresh answer has been generated.
+    """
+    try:
+        # Encoded once, for both the vector search and the cache probe
+        query_embedding = get_embedding_service().encode([user_message])[0]
+        chunks = get_relevant_chunks(user_message, query_embedding=query_embedding)
+    except Exception as e:
+        logger.error(f"Error getting relevant context: {str(e)}")
+        return [], None, None
+
+    if not chunks or not settings.ANSWER_CACHE_ENABLED:
+        return chunks, None, None
+
+    probe = {
+        "embedding": query_embedding,
+        "key": chunk_cache_key(chunks),
+        "sources": {chunk["metadata"]["source"] for chunk in chunks},
+    }
+    cached_answer = get_answer_cache().lookup(probe["embedding"], probe["key"])
+    probe["started"] = time.perf_counter()
+    return chunks, probe, cached_answer
+
+
+def remember_answer(probe, answer):
+    """Add a freshly generated answer to the semantic answer cache"""
+    if probe is None or not answer or answer == GPT_ERROR_MESSAGE:
+        return
+    get_answer_cache().store(
+        probe["embedding"],
+        probe["key"],
+        probe["sources"],
+        answer,
+        time.perf_counter() - probe["started"],
+    )
+
+
+def answer_question(user_message):
+    """
+    Answer a chat message, reusing a cached answer for near-identical questions.
+
+    Returns ``(answer, cached)``, where ``cached`` tells whether the answer
+    came from the semantic answer cache.
+    """
+    if is_document_inventory_question(user_message):
+        return generate_gpt_response(user_message, get_documents_context()), False
+
+    chunks, probe, cached_answer = retrieve_with_cache(user_message)
+    if cached_answer is not None:
+        return cached_answer, True
+
+    gpt_response = generate_gpt_response(user_message, assemble_context(chunks))
+    remember_answer(probe, gpt_response)
+    return gpt_response, False
+
+
+def stream_answer(user_message):
+    """
+    Streaming counterpart of answer_question.
+
+    Yields the answer in pieces as GPT produces them, or in one piece when a
+    cached answer is reused. Completed answers are added to the answer cache.
+    """
+    if is_document_inventory_question(user_message):
+        yield from stream_gpt_response(user_message, get_documents_context())
+        return
+
+    chunks, probe, cached_answer = retrieve_with_cache(user_message)
+    if cached_answer is not None:
+        yield cached_answer
+        return
+
+    parts = []
+    for token in stream_gpt_response(user_message, assemble_context(chunks)):
+        parts.append(token)
+        yield token
+
+    remember_answer(probe, "".join(parts).strip())
+
+
+_chat_executor = None
+_chat_executor_lock = threading.Lock()
+
+
+def get_chat_executor():
+    """Bounded thread pool for blocking retrieval work in the async chat path"""
+    global _chat_executor
+    if _chat_executor is None:
+        with _chat_executor_lock:
+            if _chat_executor is None:
+                _chat_executor = ThreadPoolExecutor(
+                    max_workers=settings.CHAT_THREAD_POOL_SIZE,
+                    thread_name_prefix="chat",
+                )
+    return _chat_executor
+
+
+async def run_blocking(func, *args):
+    """Run a blocking call (ChromaDB, embeddings, ORM) on the chat thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_chat_executor(), partial(func, *args))
+
+
+async def agenerate_gpt_response(user_message, context):
+    """Async version of generate_gpt_response using the async OpenAI client"""
+    try:
+        messages = await run_blocking(build_messages, user_message, context)
+        response = await get_async_openai_client().chat.completions.create(
+            model=GPT_MODEL, messages=messages, max_tokens=1000, temperature=0.7
+        )
+
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.error(f"Error generating GPT response: {str(e)}")
+        return GPT_ERROR_MESSAGE
+
+
+async def aanswer_question(user_message):
+    """
+    Async version of answer_question.
+
+    Retrieval runs on the bounded chat thread pool and the OpenAI call is
+    awaited, so the event loop can hold many chats in flight at once.
+    """
+    if is_document_inventory_question(user_message):
+        context = await run_blocking(get_documents_context)
+        return await agenerate_gpt_response(user_message, context), False
+
+    chunks, probe, cached_answer = await run_blocking(retrieve_with_cache, user_message)
+    if cached_answer is not None:
+        return cached_answer, True
+
+    context = await run_blocking(assemble_context, chunks)
+    gpt_response = await agenerate_gpt_response(user_message, context)
+    remember_answer(probe, gpt_response)
+    return gpt_response, False
@@ -0,0 +1,57 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_openai_client = None
+_async_openai_client = None
+_openai_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Return the process-wide OpenAI client, creating it on first use"""
+    global _openai_client
+    if _openai_client is None:
+        with _openai_client_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+
+                _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
+
+
+def get_async_openai_client():
+    """Return the process-wide AsyncOpenAI client, creating it on first use"""
+    global _async_openai_client
+    if _async_openai_client is None:
+        with _openai_client_lock:
+            if _async_openai_client is None:
+                from openai import AsyncOpenAI
+
+                _async_openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _async_openai_client
+
+
+def warm_up():
+    """
+    Load the embedding model, open ChromaDB, build the lexical index and
+    create the OpenAI client.
+
+    Everything here is otherwise initialized lazily by the first chat request;
+    call this after a worker forks to move that cost out of the request path.
+    """
+    from investment_chat_app.embeddings import get_embedding_service
+    from investment_chat_app.lexical_index import get_lexical_index
+    from investment_chat_app.vector_store import get_collection
+
+    started = time.perf_counter()
+    try:
+        get_embedding_service().encode(["warm up"])
+        get_collection()
+        get_lexical_index().sync(force=True)
+        get_openai_client()
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        logger.error(f"Error during warm-up: {str(e)}")
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from investment_chat_app.models import IndexedDocument
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_VERSION_KEY = "document_inventory:version"
+
+
+def _inventory_key(version):
+    return f"document_inventory:{version}"
+
+
+class DocumentInventory:
+    """
+    Snapshot of the indexed-document manifest for one inventory version.
+
+    ``documents`` maps each file to its page count and processing date and
+    ``prompt_section`` is the pre-rendered text chat prompts use to answer
+    availability questions.
+    """
+
+    def __init__(self, version, documents):
+        self.version = version
+        self.documents = documents
+        self.prompt_section = "\n".join(
+            f"Document: {filename}\nPages: {details['total_pages']}\nProcessed: {details['processed_date']}\n"
+            for filename, details in documents.items()
+        )
+
+    @classmethod
+    def build(cls, version):
+        """Read the manifest from the database"""
+        documents = {
+            source: {
+                "processed_date": processed_date.isoformat(),
+                "total_pages": page_count,
+            }
+            for source, page_count, processed_date in IndexedDocument.objects.order_by(
+                "source"
+            ).values_list("source", "page_count", "processed_date")
+        }
+        logger.info(
+            f"Built document inventory version {version}: {len(documents)} documents"
+        )
+        return cls(version, documents)
+
+
+def get_inventory_version():
+    """Current inventory version, shared between processes through the Django cache"""
+    version = cache.get(INVENTORY_VERSION_KEY)
+    if version is None:
+        # Start from the clock so a counter lost from the cache never
+        # reuses a version some process still holds
+        cache.add(INVENTORY_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(INVENTORY_VERSION_KEY)
+    return version
+
+
+def bump_inventory_version():
+    """Invalidate every process's inventory after files are added or removed"""
+    try:
+        try:
+            cache.incr(INVENTORY_VERSION_KEY)
+        except ValueError:
+            cache.add(INVENTORY_VERSION_KEY, time.time_ns(), timeout=None)
+    except Exception as e:
+        logger.error(f"Error bumping document inventory version: {str(e)}")
+
+
+_inventory = None
+_inventory_loaded_at = 0.0
+_inventory_lock = threading.Lock()
+
+
+def _is_current(version):
+    return (
+        _inventory is not None
+        and _inventory.version == version
+        and time.monotonic() - _inventory_loaded_at < settings.DOCUMENT_INVENTORY_TTL
+    )
+
+
+def get_document_inventory():
+    """
+    Return the DocumentInventory for the current version.
+
+    Each process keeps the inventory in memory and shares it through the
+    Django cache, so the manifest is read once per version rather than on
+    every chat. Entries also expire after DOCUMENT_INVENTORY_TTL seconds in
+    case ingestion ran against a cache this process does not share.
+    """
+    global _inventory, _inventory_loaded_at
+    try:
+        version = get_inventory_version()
+        if _is_current(version):
+            return _inventory
+        with _inventory_lock:
+            if _is_current(version):
+                return _inventory
+            key = _inventory_key(version)
+            inventory = cache.get(key)
+            if inventory is None:
+                inventory = DocumentInventory.build(version)
+                cache.set(key, inventory, settings.DOCUMENT_INVENTORY_TTL)
+            _inventory = inventory
+            _inventory_loaded_at = time.monotonic()
+            return inventory
+    except Exception as e:
+        logger.error(f"Error getting document inventory: {str(e)}")
+        return DocumentInventory(None, {})
@@ -0,0 +1,278 @@
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """
+    Shared sentence embedding encoder for ingestion, retrieval and summaries.
+
+    Vectors are cached in memory (LRU) and optionally in a SQLite file keyed
+    by a hash of the model name and text, so identical chunks and repeated
+    queries are only encoded once. Cache misses from concurrent callers are
+    collected for up to ``max_wait`` seconds and encoded as one batch.
+    """
+
+    def __init__(
+        self,
+        model_name="all-MiniLM-L6-v2",
+        batch_size=64,
+        max_wait=0.005,
+        cache_size=50000,
+        cache_path=None,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._disk = None
+        self._disk_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "encoded_texts": 0,
+            "encode_batches": 0,
+            "encode_seconds": 0.0,
+        }
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    started = time.perf_counter()
+                    self._model = SentenceTransformer(self.model_name)
+                    logger.info(
+                        f"Loaded {self.model_name} in {time.perf_counter() - started:.2f}s"
+                    )
+        return self._model
+
+    def _key(self, text):
+        return hashlib.blake2b(
+            f"{self.model_name}\0{text}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    def _get_disk(self):
+        if self._disk is None and self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            self._disk = sqlite3.connect(self.cache_path, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+        return self._disk
+
+    def _disk_get(self, keys):
+        disk = self._get_disk()
+        if disk is None or not keys:
+            return {}
+        found = {}
+        with self._disk_lock:
+            # Stay well under SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = disk.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _disk_put(self, items):
+        disk = self._get_disk()
+        if disk is None or not items:
+            return
+        with self._disk_lock:
+            disk.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.astype(np.float32).tobytes()) for key, vector in items],
+            )
+            disk.commit()
+
+    def _remember(self, key, vector):
+        with self._cache_lock:
+            self._cache[key] = vector
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _ensure_batcher(self):
+        if self._batcher is None:
+            with self._batcher_lock:
+                if self._batcher is None:
+                    self._batcher = threading.Thread(
+                        target=self._batch_loop, name="embedding-batcher", daemon=True
+                    )
+                    self._batcher.start()
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = self._encode_now(texts)
+            except Exception as e:
+                logger.error(f"Error encoding {len(texts)} texts: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset : offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def _encode_now(self, texts):
+        started = time.perf_counter()
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=False,
+        )
+        with self._cache_lock:
+            self.counters["encoded_texts"] += len(texts)
+            self.counters["encode_batches"] += 1
+            self.counters["encode_seconds"] += time.perf_counter() - started
+        return np.asarray(vectors, dtype=np.float32)
+
+    def encode(self, texts):
+        """Return a 2-D float32 array with one embedding per input text"""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        keys = [self._key(text) for text in texts]
+        vectors = {}
+        with self._cache_lock:
+            for key in set(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    vectors[key] = self._cache[key]
+            self.counters["memory_hits"] += len(vectors)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        from_disk = self._disk_get(missing)
+        for key, vector in from_disk.items():
+            vectors[key] = vector
+            self._remember(key, vector)
+
+        to_encode = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                to_encode.setdefault(key, text)
+
+        with self._cache_lock:
+            self.counters["disk_hits"] += len(from_disk)
+            self.counters["misses"] += len(to_encode)
+
+        if to_encode:
+            self._ensure_batcher()
+            future = Future()
+            self._queue.put((list(to_encode.values()), future))
+            encoded = future.result()
+            new_items = list(zip(to_encode.keys(), encoded))
+            for key, vector in new_items:
+                vectors[key] = vector
+                self._remember(key, vector)
+            self._disk_put(new_items)
+
+        return np.vstack([vectors[key] for key in keys])
+
+    @property
+    def max_tokens(self):
+        """Word pieces the model embeds per text, not counting [CLS] and [SEP]"""
+        return self.model.max_seq_length - 2
+
+    def count_tokens(self, text):
+        """Number of word pieces the model's own tokenizer splits ``text`` into"""
+        return len(self.model.tokenizer.tokenize(text))
+
+    def stats(self):
+        """Snapshot of cache and encoder counters"""
+        with self._cache_lock:
+            counters = dict(self.counters)
+            counters["memory_cache_size"] = len(self._cache)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        counters["hit_rate"] = (
+            round((counters["memory_hits"] + counters["disk_hits"]) / lookups, 3)
+            if lookups
+            else 0.0
+        )
+        counters["encode_seconds"] = round(counters["encode_seconds"], 3)
+        return counters
+
+
+class ServiceEmbeddingFunction:
+    """
+    ChromaDB embedding function that delegates to the shared EmbeddingService.
+
+    Implements Chroma's ``__call__(self, input)`` protocol without importing
+    chromadb, so importing this module stays cheap.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    def __call__(self, input):
+        return self.service.encode(input).tolist()
+
+
+_embedding_service = None
+_embedding_service_lock = threading.Lock()
+
+
+def get_embedding_service():
+    """Return the process-wide EmbeddingService, creating it on first use"""
+    global _embedding_service
+    if _embedding_service is None:
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService(
+                    model_name=settings.EMBEDDING_MODEL_NAME,
+                    batch_size=settings.EMBEDDING_BATCH_SIZE,
+                    max_wait=settings.EMBEDDING_BATCH_WAIT_MS / 1000,
+                    cache_size=settings.EMBEDDING_CACHE_SIZE,
+                    cache_path=settings.EMBEDDING_CACHE_PATH,
+                )
+    return _embedding_service
@@ -0,0 +1,659 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from collections import Counter, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from django.conf import settings
+
+from investment_chat_app.embeddings import get_embedding_service
+from investment_chat_app.ingestion_queue import (
+    claim_ingestion_jobs,
+    document_path,
+    finish_ingestion_job,
+    queued_sources,
+    requeue_stale_ingestion_jobs,
+    retry_failed_ingestion_jobs,
+)
+from investment_chat_app.page_cache import (
+    get_cached_pdf_pages,
+    get_page_text_cache,
+    get_pdf_pages,
+    remember_pdf_pages,
+)
+from investment_chat_app.utils.chunking import get_chunker
+from investment_chat_app.utils.filings import fiscal_year, parse_document_name
+from investment_chat_app.utils.fingerprint import Fingerprint, fingerprint_file
+from investment_chat_app.utils.pdf import extract_pdf_pages, iter_pdf_pages
+from investment_chat_app.utils.text import PageCleaner, normalize_whitespace
+from investment_chat_app.vector_store import (
+    get_all_documents_summary,
+    get_collection,
+    get_file_metadata,
+    get_processed_files,
+    rebuild_manifest_from_collection,
+    record_indexed_file,
+    remove_file_from_collection,
+)
+
+logger = logging.getLogger(__name__)
+
+EDGAR_DIR = os.path.join(settings.BASE_DIR, "investment_chat_app", "edgar_files")
+
+# One file for the ingestion pipeline; ``metadata`` is added to every chunk
+IngestionTask = namedtuple(
+    "IngestionTask", ["filename", "file_path", "fingerprint", "metadata"]
+)
+
+# Drops control characters and whitespace runs before pages are chunked
+page_cleaner = PageCleaner(
+    normalize_whitespace, memo_size=settings.TEXT_CLEAN_MEMO_SIZE
+)
+
+
+class IngestionStats:
+    """Per-stage counters and timings for one ingestion run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.files = 0
+        self.failed_files = 0
+        self.pages = 0
+        self.chunks = 0
+        self.extract_seconds = 0.0
+        self.chunk_seconds = 0.0
+        self.write_seconds = 0.0
+
+    @staticmethod
+    def _rate(count, seconds):
+        return count / seconds if seconds > 0 else 0.0
+
+    def report(self):
+        """Log throughput for each pipeline stage and return it as a dict"""
+        wall_seconds = time.perf_counter() - self.started
+        summary = {
+            "files": self.files,
+            "failed_files": self.failed_files,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "wall_seconds": round(wall_seconds, 2),
+            "extract_pages_per_second": round(
+                self._rate(self.pages, self.extract_seconds), 1
+            ),
+            "chunk_pages_per_second": round(
+                self._rate(self.pages, self.chunk_seconds), 1
+            ),
+            "write_chunks_per_second": round(
+                self._rate(self.chunks, self.write_seconds), 1
+            ),
+        }
+        logger.info("=== Ingestion Throughput ===")
+        logger.info(
+            f"Extract: {self.pages} pages in {self.extract_seconds:.2f}s worker time "
+            f"({summary['extract_pages_per_second']} pages/s)"
+        )
+        logger.info(
+            f"Chunk: {self.chunks} chunks in {self.chunk_seconds:.2f}s "
+            f"({summary['chunk_pages_per_second']} pages/s)"
+        )
+        logger.info(
+            f"Write: {self.chunks} chunks in {self.write_seconds:.2f}s "
+            f"({summary['write_chunks_per_second']} chunks/s)"
+        )
+        logger.info(
+            f"Total: {self.files} files ({self.failed_files} failed) "
+            f"in {wall_seconds:.2f}s wall time"
+        )
+        logger.info(f"Embeddings: {get_embedding_service().stats()}")
+        logger.info(f"Page text cache: {get_page_text_cache().stats()}")
+        return summary
+
+
+def get_document_chunker():
+    """
+    Build the chunker configured by the CHUNKER settings.
+
+    Token chunks are measured with the embedding model's own tokenizer, so
+    no chunk is truncated by the model, and CHUNK_MAX_TOKENS is capped at
+    the model's window.
+    """
+    if settings.CHUNKER == "characters":
+        return get_chunker("characters")
+    service = get_embedding_service()
+    max_tokens = settings.CHUNK_MAX_TOKENS
+    if max_tokens > service.max_tokens:
+        logger.warning(
+            f"CHUNK_MAX_TOKENS={max_tokens} exceeds the {service.max_tokens}-token "
+            f"window of {service.model_name}, using {service.max_tokens}"
+        )
+        max_tokens = service.max_tokens
+    return get_chunker(
+        settings.CHUNKER,
+        max_tokens=max_tokens,
+        overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+        count_tokens=service.count_tokens,
+    )
+
+
+def process_pdf_in_batches(file_path, filename, file_hash, pages=None, metadata=None):
+    """
+    Process a single PDF file and yield chunks of text.
+
+    ``pages`` takes already extracted (page_number, text) pairs, as produced
+    by the ingestion worker processes; otherwise the PDF is read here. Pages
+    are cleaned and chunked lazily, one page at a time. ``metadata`` is added
+    to every chunk.
+    """
+    processed_date = datetime.now().isoformat()
+    # Ticker, year and form type from the file name, used as query filters;
+    # metadata known from the download takes precedence
+    document_metadata = {**parse_document_name(filename), **(metadata or {})}
+    if pages is None:
+        pages = iter_pdf_pages(file_path)
+
+    try:
+        cleaned_pages = (
+            (page_num, page_cleaner(page_text)) for page_num, page_text in pages
+        )
+        for chunk_counter, chunk in enumerate(
+            get_document_chunker().chunk(cleaned_pages)
+        ):
+            yield {
+                "text": chunk.text,
+                "id": f"{filename}-chunk-{chunk_counter}",
+                "metadata": {
+                    "source": filename,
+                    "chunk": chunk_counter,
+                    "page": chunk.page_start,
+                    "page_start": chunk.page_start,
+                    "page_end": chunk.page_end,
+                    "tokens": chunk.tokens,
+                    "processed_date": processed_date,
+                    "file_hash": file_hash,
+                    **document_metadata,
+                },
+            }
+
+    except Exception as e:
+        logger.error(f"Error processing file {filename}: {str(e)}")
+        raise
+
+
+def _add_batch(chunk_batch, filename, stats):
+    started = time.perf_counter()
+    try:
+        get_collection().add(
+            ids=chunk_batch["ids"],
+            documents=chunk_batch["documents"],
+            metadatas=chunk_batch["metadatas"],
+        )
+        logger.info(f"Added batch of {len(chunk_batch['ids'])} chunks from {filename}")
+    except Exception as e:
+        logger.error(f"Error adding batch to ChromaDB: {str(e)}")
+        raise
+    finally:
+        stats.write_seconds += time.perf_counter() - started
+
+
+def write_document(
+    filename, file_path, fingerprint, pages=None, stats=None, metadata=None
+):
+    """
+    Chunk a PDF and write it to ChromaDB, replacing any previous version.
+
+    This is the single writer stage of the ingestion pipeline; it is the only
+    code that adds chunks to the collection. If chunking or a write fails the
+    chunks written so far are removed and the error is raised, so the file is
+    not recorded as indexed and is picked up again.
+    """
+    stats = stats or IngestionStats()
+    if get_file_metadata(filename):
+        # Remove old version if file was modified; add() does not overwrite
+        # existing ids, so stale chunks would otherwise survive the rewrite
+        if not remove_file_from_collection(filename):
+            raise RuntimeError(f"Could not remove the previous version of {filename}")
+
+    chunk_batch = {"ids": [], "documents": [], "metadatas": []}
+    batch_size = settings.INDEXING_BATCH_SIZE
+    chunk_count = 0
+    page_count = 0
+
+    logger.info(f"Processing {filename}")
+    chunk_started = time.perf_counter()
+    try:
+        for chunk in process_pdf_in_batches(
+            file_path, filename, fingerprint.hash, pages, metadata
+        ):
+            chunk_batch["ids"].append(chunk["id"])
+            chunk_batch["documents"].append(chunk["text"])
+            chunk_batch["metadatas"].append(chunk["metadata"])
+            chunk_count += 1
+            page_count = max(page_count, chunk["metadata"]["page_end"])
+
+            if len(chunk_batch["ids"]) >= batch_size:
+                stats.chunk_seconds += time.perf_counter() - chunk_started
+                _add_batch(chunk_batch, filename, stats)
+                chunk_batch = {"ids": [], "documents": [], "metadatas": []}
+                chunk_started = time.perf_counter()
+
+        stats.chunk_seconds += time.perf_counter() - chunk_started
+        if chunk_batch["ids"]:
+            _add_batch(chunk_batch, filename, stats)
+    except Exception:
+        # Drop the partial document rather than leave it without a manifest row
+        remove_file_from_collection(filename)
+        raise
+
+    record_indexed_file(
+        filename,
+        file_hash=fingerprint.hash,
+        file_size=fingerprint.size,
+        file_mtime=fingerprint.mtime,
+        page_count=page_count,
+        chunk_count=chunk_count,
+    )
+    stats.files += 1
+    stats.chunks += chunk_count
+    return chunk_count
+
+
+def index_file(filename, edgar_dir=EDGAR_DIR, fingerprint=None):
+    """Index a single PDF in the current process"""
+    file_path = os.path.join(edgar_dir, filename)
+    if fingerprint is None:
+        fingerprint = fingerprint_file(file_path)
+
+    stats = IngestionStats()
+    pages, stats.extract_seconds = get_pdf_pages(file_path, fingerprint.hash)
+    stats.pages = len(pages)
+    write_document(filename, file_path, fingerprint, pages, stats)
+    return stats
+
+
+def run_ingestion_pipeline(tasks, workers=None, max_pending=None, on_result=None):
+    """
+    Index IngestionTasks with parallel extraction and one writer.
+
+    Page text extraction fans out across a process pool. At most
+    ``max_pending`` files are extracted or waiting to be written at any time,
+    which bounds the memory held by extracted-but-unwritten pages. Chunking
+    and ChromaDB inserts happen in this process as extractions complete.
+    ``on_result(task, error)`` is called for every task, with an empty error
+    on success.
+    """
+    workers = workers or settings.INDEXING_WORKERS
+    max_pending = max(max_pending or settings.INDEXING_MAX_PENDING, 1)
+    stats = IngestionStats()
+    tasks = iter(tasks)
+    on_result = on_result or (lambda task, error: None)
+
+    logger.info(f"Starting ingestion with {workers} workers, max {max_pending} pending")
+    # Spawn rather than fork: this process may already hold model and database
+    # threads, and the workers only need the Django-free PDF helpers
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+        pending = {}
+
+        def submit_next():
+            for task in tasks:
+                pages = get_cached_pdf_pages(task.fingerprint.hash)
+                if pages is not None:
+                    # Already extracted once; hand the cached pages straight
+                    # to the writer instead of re-parsing in a worker
+                    future = Future()
+                    future.set_result((pages, 0.0))
+                else:
+                    future = pool.submit(extract_pdf_pages, task.file_path)
+                pending[future] = task
+                return
+
+        for _ in range(max_pending):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                submit_next()
+                try:
+                    pages, extract_seconds = future.result()
+                except Exception as e:
+                    logger.error(f"Error extracting {task.filename}: {str(e)}")
+                    stats.failed_files += 1
+                    on_result(task, f"Extraction failed: {str(e)}")
+                    continue
+
+                if extract_seconds:
+                    remember_pdf_pages(task.fingerprint.hash, pages)
+                stats.pages += len(pages)
+                stats.extract_seconds += extract_seconds
+                try:
+                    write_document(
+                        task.filename,
+                        task.file_path,
+                        task.fingerprint,
+                        pages,
+                        stats,
+                        task.metadata,
+                    )
+                except Exception as e:
+                    logger.error(f"Error writing {task.filename}: {str(e)}")
+                    stats.failed_files += 1
+                    on_result(task, f"Write failed: {str(e)}")
+                    continue
+                on_result(task, "")
+
+    return stats.report()
+
+
+def load_documents_to_chromadb(edgar_dir=EDGAR_DIR, workers=None, max_pending=None):
+    """Load documents into ChromaDB, processing only new or modified files"""
+    try:
+        if not os.path.exists(edgar_dir):
+            logger.error(f"Directory not found: {edgar_dir}")
+            return False
+
+        # Get processed files from the manifest, seeding it from the
+        # collection the first time it is used against existing data
+        processed_files = get_processed_files()
+        if not processed_files and get_collection().count() > 0:
+            rebuild_manifest_from_collection()
+            processed_files = get_processed_files()
+
+        # Fingerprint current files, skipping the hash when size and mtime
+        # match what the manifest recorded
+        current_files = {
+            f: fingerprint_file(os.path.join(edgar_dir, f), processed_files.get(f))
+            for f in os.listdir(edgar_dir)
+            if f.endswith(".pdf")
+        }
+
+        # Identify new and modified files
+        files_to_process = []
+        for filename, fingerprint in current_files.items():
+            if filename not in processed_files:
+                logger.info(f"New file found: {filename}")
+                files_to_process.append(filename)
+            elif processed_files[filename]["hash"] != fingerprint.hash:
+                logger.info(f"Modified file found: {filename}")
+                files_to_process.append(filename)
+
+        # Identify deleted files; documents indexed from the ingestion queue
+        # live outside the edgar directory
+        downloaded = queued_sources()
+        for filename in processed_files:
+            if filename not in current_files and filename not in downloaded:
+                logger.info(f"Removing deleted file from database: {filename}")
+                remove_file_from_collection(filename)
+
+        if not files_to_process:
+            logger.info("No new or modified files to process")
+            return True
+
+        logger.info(f"Processing {len(files_to_process)} files")
+
+        run_ingestion_pipeline(
+            [
+                IngestionTask(
+                    filename,
+                    os.path.join(edgar_dir, filename),
+                    current_files[filename],
+                    None,
+                )
+                for filename in files_to_process
+            ],
+            workers=workers,
+            max_pending=max_pending,
+        )
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error in load_documents_to_chromadb: {str(e)}")
+        return False
+
+
+def _job_fingerprint(job, known):
+    """Fingerprint a queued file, reusing the hash recorded when it was downloaded"""
+    path = document_path(job.path)
+    stat = os.stat(path)
+    if job.file_hash and job.file_size == stat.st_size:
+        return Fingerprint(job.file_hash, stat.st_size, stat.st_mtime)
+    return fingerprint_file(path, known)
+
+
+def _job_metadata(job):
+    """Chunk metadata carried from the download"""
+    metadata = {"ticker": job.ticker, "form_type": job.form_type}
+    if job.filing_date:
+        metadata["fiscal_year"] = fiscal_year(
+            job.form_type, job.filing_date, job.period_of_report
+        )
+        metadata["filing_year"] = job.filing_date.year
+        metadata["filing_date"] = job.filing_date.isoformat()
+    return {key: value for key, value in metadata.items() if value}
+
+
+def process_ingestion_queue(workers=None, max_pending=None, batch_size=None):
+    """
+    Index the files waiting in the ingestion queue, a batch of jobs at a time.
+
+    Files whose content hash already matches the manifest are marked done
+    without re-embedding. Jobs that failed in an earlier pass are retried
+    until they have been attempted INGESTION_MAX_ATTEMPTS times. Returns a
+    Counter of job outcomes.
+    """
+    batch_size = batch_size or settings.INGESTION_QUEUE_BATCH_SIZE
+    outcomes = Counter()
+    retry_failed_ingestion_jobs(settings.INGESTION_MAX_ATTEMPTS)
+    while True:
+        jobs = claim_ingestion_jobs(batch_size)
+        if not jobs:
+            return outcomes
+
+        processed_files = get_processed_files()
+        tasks = {}
+        for job in jobs:
+            try:
+                fingerprint = _job_fingerprint(job, processed_files.get(job.source))
+            except OSError as e:
+                finish_ingestion_job(job, f"File not readable: {str(e)}")
+                outcomes["failed"] += 1
+                continue
+            if processed_files.get(job.source, {}).get("hash") == fingerprint.hash:
+                finish_ingestion_job(job)
+                outcomes["unchanged"] += 1
+                continue
+            tasks[job.source] = (
+                job,
+                IngestionTask(
+                    job.source, document_path(job.path), fingerprint, _job_metadata(job)
+                ),
+            )
+
+        def on_result(task, error):
+            finish_ingestion_job(tasks[task.filename][0], error)
+            outcomes["failed" if error else "indexed"] += 1
+
+        if tasks:
+            logger.info(f"Indexing {len(tasks)} queued files")
+            run_ingestion_pipeline(
+                [task for _, task in tasks.values()],
+                workers=workers,
+                max_pending=max_pending,
+                on_result=on_result,
+            )
+
+
+def verify_document_loading():
+    """Verify all documents were loaded correctly"""
+    try:
+        all_docs = get_all_documents_summary()
+        logger.info("=== Document Loading Verification ===")
+        logger.info(f"Total unique documents in collection: {len(all_docs)}")
+        for filename, details in all_docs.items():
+            logger.info(f"Document: {filename}")
+            logger.info(f"  Pages: {details['total_pages']}")
+            logger.info(f"  Processed: {details['processed_date']}")
+        logger.info("=== End Verification ===")
+        return len(all_docs)
+    except Exception as e:
+        logger.error(f"Error in verification: {str(e)}")
+        return 0
+
+
+def scan_edgar_dir(edgar_dir=EDGAR_DIR):
+    """Return {filename: (size, mtime)} for every PDF in the edgar directory"""
+    snapshot = {}
+    try:
+        with os.scandir(edgar_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".pdf"):
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime)
+    except FileNotFoundError:
+        logger.error(f"Directory not found: {edgar_dir}")
+    return snapshot
+
+
+class IndexingWorker:
+    """
+    Watches the edgar directory and indexes new, changed or deleted PDFs.
+
+    A watcher thread polls the directory and puts filenames on a queue once
+    their size and mtime have been stable for one poll, so files that are
+    still being copied in are not picked up half-written. The calling thread
+    drains that queue and the database ingestion queue and does all ChromaDB
+    writes. A file only counts as indexed once it has been written; failed
+    files are retried on later polls, up to INGESTION_MAX_ATTEMPTS times per
+    version of the file.
+    """
+
+    def __init__(self, edgar_dir=EDGAR_DIR, poll_interval=5.0):
+        self.edgar_dir = edgar_dir
+        self.poll_interval = poll_interval
+        self.queue = queue.Queue()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._indexed = {}
+        self._failures = {}  # filename -> (stat, attempts) of failed versions
+        self._last_seen = {}
+        self._stop_event = threading.Event()
+
+    def enqueue(self, filename):
+        """Queue a file for (re)indexing unless it is already waiting"""
+        with self._pending_lock:
+            if filename in self._pending:
+                return
+            self._pending.add(filename)
+        self.queue.put(filename)
+
+    def poll(self):
+        """Compare the directory against the last indexed state and queue changes"""
+        current = scan_edgar_dir(self.edgar_dir)
+
+        for filename, stat in current.items():
+            stable = self._last_seen.get(filename) == stat
+            if (
+                stable
+                and self._indexed.get(filename) != stat
+                and self._should_retry(filename, stat)
+            ):
+                self.enqueue(filename)
+
+        for filename in list(self._indexed):
+            if filename not in current:
+                del self._indexed[filename]
+                self.enqueue(filename)
+
+        self._last_seen = current
+
+    def _should_retry(self, filename, stat):
+        failed_stat, attempts = self._failures.get(filename, (None, 0))
+        return failed_stat != stat or attempts < settings.INGESTION_MAX_ATTEMPTS
+
+    def process_file(self, filename):
+        """Index a queued file, or drop it from the collection if it is gone"""
+        file_path = os.path.join(self.edgar_dir, filename)
+        if os.path.exists(file_path):
+            # Taken before indexing, so a change made meanwhile is seen later
+            stat = os.stat(file_path)
+            stat = (stat.st_size, stat.st_mtime)
+            try:
+                index_file(filename, self.edgar_dir)
+            except Exception:
+                failed_stat, attempts = self._failures.get(filename, (None, 0))
+                attempts = attempts + 1 if failed_stat == stat else 1
+                self._failures[filename] = (stat, attempts)
+                if attempts >= settings.INGESTION_MAX_ATTEMPTS:
+                    logger.error(
+                        f"Giving up on {filename} after {attempts} attempts "
+                        "until it changes"
+                    )
+                raise
+            self._indexed[filename] = stat
+            self._failures.pop(filename, None)
+        else:
+            logger.info(f"Removing deleted file from database: {filename}")
+            remove_file_from_collection(filename)
+
+    def _watch(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling {self.edgar_dir}: {str(e)}")
+            self._stop_event.wait(self.poll_interval)
+
+    def drain_ingestion_queue(self, workers=None, max_pending=None):
+        """Index downloads waiting in the database ingestion queue"""
+        try:
+            outcomes = process_ingestion_queue(workers, max_pending)
+            if outcomes:
+                logger.info(f"Ingestion queue: {dict(outcomes)}")
+        except Exception as e:
+            logger.error(f"Error processing ingestion queue: {str(e)}")
+
+    def run(self, workers=None, max_pending=None):
+        """
+        Reconcile the collection with the directory, then watch for changes.
+
+        Between directory changes the worker also consumes the ingestion
+        queue, so filings are indexed as sec_filings downloads them.
+        """
+        load_documents_to_chromadb(self.edgar_dir, workers, max_pending)
+        requeue_stale_ingestion_jobs(settings.INGESTION_JOB_TIMEOUT)
+        self.drain_ingestion_queue(workers, max_pending)
+        verify_document_loading()
+
+        self._indexed = scan_edgar_dir(self.edgar_dir)
+        self._last_seen = dict(self._indexed)
+
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        logger.info(f"Watching {self.edgar_dir} every {self.poll_interval}s")
+
+        while not self._stop_event.is_set():
+            try:
+                filename = self.queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                self.drain_ingestion_queue(workers, max_pending)
+                continue
+
+            try:
+                self.process_file(filename)
+            except Exception as e:
+                logger.error(f"Error indexing {filename}: {str(e)}")
+            finally:
+                # Still pending while it is processed, so the watcher does
+                # not queue it again before its outcome is recorded
+                with self._pending_lock:
+                    self._pending.discard(filename)
+                self.queue.task_done()
+
+    def stop(self):
+        self._stop_event.set()
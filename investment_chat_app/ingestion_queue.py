@@ -0,0 +1,118 @@
+import logging
+import os
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from investment_chat_app.models import IngestionJob
+
+logger = logging.getLogger(__name__)
+
+
+def document_path(path):
+    """Absolute path of a downloaded filing; older rows store it relative to BASE_DIR"""
+    return os.path.join(settings.BASE_DIR, path)
+
+
+def enqueue_filings(filings):
+    """
+    Queue downloaded SECFilings rows for chunking and embedding.
+
+    A file queued again (e.g. re-downloaded after it changed) has its job
+    reset to pending rather than duplicated. Returns the number queued.
+    """
+    jobs = [
+        IngestionJob(
+            source=os.path.basename(filing.path_to_doc),
+            path=document_path(filing.path_to_doc),
+            file_hash=filing.file_hash,
+            file_size=filing.file_size,
+            ticker=filing.ticker,
+            form_type=filing.form_type,
+            filing_date=filing.filing_date,
+            period_of_report=filing.period_of_report,
+            status=IngestionJob.STATUS_PENDING,
+        )
+        for filing in filings
+    ]
+    IngestionJob.objects.bulk_create(
+        jobs,
+        update_conflicts=True,
+        unique_fields=["source"],
+        update_fields=[
+            "path",
+            "file_hash",
+            "file_size",
+            "ticker",
+            "form_type",
+            "filing_date",
+            "period_of_report",
+            "status",
+            "error",
+            "updated_at",
+        ],
+    )
+    return len(jobs)
+
+
+def claim_ingestion_jobs(limit):
+    """
+    Mark up to ``limit`` pending jobs as running and return them, oldest first.
+
+    On databases that support it the rows are locked with SKIP LOCKED, so
+    several indexing workers can share one queue without taking the same job.
+    """
+    with transaction.atomic():
+        pending = IngestionJob.objects.filter(
+            status=IngestionJob.STATUS_PENDING
+        ).order_by("created_at")
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        jobs = list(pending[:limit])
+        IngestionJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=IngestionJob.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=timezone.now(),
+        )
+    return jobs
+
+
+def finish_ingestion_job(job, error=""):
+    """Record the outcome of a claimed job"""
+    # Only running jobs are finished, so a file re-queued while it was being
+    # indexed stays pending and is indexed again
+    IngestionJob.objects.filter(pk=job.pk, status=IngestionJob.STATUS_RUNNING).update(
+        status=IngestionJob.STATUS_FAILED if error else IngestionJob.STATUS_DONE,
+        error=error,
+        updated_at=timezone.now(),
+    )
+
+
+def requeue_stale_ingestion_jobs(timeout):
+    """Return jobs left running for over ``timeout`` seconds (e.g. by a crashed worker) to the queue"""
+    count = IngestionJob.objects.filter(
+        status=IngestionJob.STATUS_RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status=IngestionJob.STATUS_PENDING, updated_at=timezone.now())
+    if count:
+        logger.info(f"Re-queued {count} stale ingestion jobs")
+    return count
+
+
+def retry_failed_ingestion_jobs(max_attempts):
+    """Return failed jobs that have been tried fewer than ``max_attempts`` times to the queue"""
+    count = IngestionJob.objects.filter(
+        status=IngestionJob.STATUS_FAILED, attempts__lt=max_attempts
+    ).update(status=IngestionJob.STATUS_PENDING, updated_at=timezone.now())
+    if count:
+        logger.info(f"Retrying {count} failed ingestion jobs")
+    return count
+
+
+def queued_sources():
+    """Sources indexed through the queue rather than from the edgar directory"""
+    return set(IngestionJob.objects.values_list("source", flat=True))
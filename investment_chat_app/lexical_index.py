@@ -0,0 +1,211 @@
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from investment_chat_app.models import IndexedDocument
+from investment_chat_app.vector_store import get_collection
+
+logger = logging.getLogger(__name__)
+
+# Words, item numbers like "7a" and figures like "1,234.5" as single terms
+_TERM = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+
+
+def tokenize(text):
+    """Lowercased lexical terms of ``text``"""
+    return _TERM.findall(text.lower())
+
+
+def matches_where(metadata, where):
+    """Evaluate the subset of ChromaDB ``where`` syntax used by query analysis"""
+    if not where:
+        return True
+    if "$and" in where:
+        return all(matches_where(metadata, clause) for clause in where["$and"])
+    for field, condition in where.items():
+        value = metadata.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over the chunks stored in ChromaDB.
+
+    Documents are added and removed a whole source file at a time, mirroring
+    how the indexer replaces files, so updates are incremental. Only terms,
+    lengths and filterable metadata are kept; chunk text stays in ChromaDB.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(dict)  # term -> {chunk_id: term frequency}
+        self._lengths = {}  # chunk_id -> number of terms
+        self._metadata = {}  # chunk_id -> chunk metadata
+        self._terms = {}  # chunk_id -> terms, for removal
+        self._sources = defaultdict(set)  # source -> chunk_ids
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, chunk_id, text, metadata):
+        """Index one chunk, replacing any previous version of it"""
+        counts = Counter(tokenize(text))
+        with self._lock:
+            if chunk_id in self._lengths:
+                self.remove(chunk_id)
+            for term, tf in counts.items():
+                self._postings[term][chunk_id] = tf
+            length = sum(counts.values())
+            self._lengths[chunk_id] = length
+            self._total_length += length
+            self._metadata[chunk_id] = metadata
+            self._terms[chunk_id] = list(counts)
+            self._sources[metadata.get("source")].add(chunk_id)
+
+    def remove(self, chunk_id):
+        """Drop one chunk from the index"""
+        with self._lock:
+            if chunk_id not in self._lengths:
+                return
+            for term in self._terms.pop(chunk_id):
+                postings = self._postings[term]
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._lengths.pop(chunk_id)
+            source = self._metadata.pop(chunk_id).get("source")
+            self._sources[source].discard(chunk_id)
+            if not self._sources[source]:
+                del self._sources[source]
+
+    def add_source(self, source, ids, documents, metadatas):
+        """Replace every chunk of ``source`` with the given chunks"""
+        with self._lock:
+            self.remove_source(source)
+            for chunk_id, text, metadata in zip(ids, documents, metadatas):
+                self.add(chunk_id, text, metadata)
+
+    def remove_source(self, source):
+        """Drop every chunk of ``source``"""
+        with self._lock:
+            for chunk_id in list(self._sources.get(source, ())):
+                self.remove(chunk_id)
+
+    def search(self, query, n_results=8, where=None):
+        """Return [(chunk_id, score)] for the best BM25 matches, best first"""
+        terms = set(tokenize(query))
+        with self._lock:
+            total = len(self._lengths)
+            if not total or not terms:
+                return []
+            average_length = self._total_length / total
+
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (total - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for chunk_id, tf in postings.items():
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self._lengths[chunk_id] / average_length
+                    )
+                    scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+            candidates = scores.items()
+            if where:
+                candidates = (
+                    (chunk_id, score)
+                    for chunk_id, score in candidates
+                    if matches_where(self._metadata[chunk_id], where)
+                )
+            return heapq.nlargest(n_results, candidates, key=lambda item: item[1])
+
+
+class LexicalIndex(BM25Index):
+    """
+    BM25Index kept in step with the IndexedDocument manifest.
+
+    ``sync`` compares the manifest's file hashes with the ones indexed here
+    and loads or drops only the sources that changed, so each web process
+    picks up the indexer's writes without rebuilding from scratch.
+    """
+
+    def __init__(self, refresh_seconds=30, **kwargs):
+        super().__init__(**kwargs)
+        self.refresh_seconds = refresh_seconds
+        self._hashes = {}  # source -> file hash currently indexed
+        self._synced_at = None
+        self._sync_lock = threading.Lock()
+
+    def sync(self, force=False):
+        """Bring the index up to date with the manifest if it is due for a check"""
+        now = time.monotonic()
+        if (
+            not force
+            and self._synced_at is not None
+            and now - self._synced_at < self.refresh_seconds
+        ):
+            return
+        with self._sync_lock:
+            if not force and self._synced_at is not None:
+                if now - self._synced_at < self.refresh_seconds:
+                    return
+            started = time.perf_counter()
+            manifest = dict(IndexedDocument.objects.values_list("source", "file_hash"))
+
+            removed = [s for s in self._hashes if s not in manifest]
+            for source in removed:
+                self.remove_source(source)
+                del self._hashes[source]
+
+            changed = [s for s, h in manifest.items() if self._hashes.get(s) != h]
+            for source in changed:
+                results = get_collection().get(
+                    where={"source": source}, include=["documents", "metadatas"]
+                )
+                self.add_source(
+                    source, results["ids"], results["documents"], results["metadatas"]
+                )
+                self._hashes[source] = manifest[source]
+
+            self._synced_at = time.monotonic()
+            if removed or changed:
+                logger.info(
+                    f"Lexical index synced in {time.perf_counter() - started:.2f}s: "
+                    f"{len(changed)} files loaded, {len(removed)} removed, "
+                    f"{len(self)} chunks"
+                )
+
+
+_lexical_index = None
+_lexical_index_lock = threading.Lock()
+
+
+def get_lexical_index():
+    """Return the process-wide LexicalIndex, creating it on first use"""
+    global _lexical_index
+    if _lexical_index is None:
+        with _lexical_index_lock:
+            if _lexical_index is None:
+                _lexical_index = LexicalIndex(
+                    refresh_seconds=settings.LEXICAL_INDEX_REFRESH_SECONDS
+                )
+    return _lexical_index
@@ -0,0 +1,124 @@
+import os
+import re
+import statistics
+import time
+
+from django.core.management import BaseCommand
+
+from investment_chat_app.indexing import EDGAR_DIR
+from investment_chat_app.utils.sections import SECTION_HEADERS, find_sections
+
+# Header and boundary patterns of the per-section extractor this replaced,
+# kept here so the benchmark always compares against the same baseline
+LEGACY_HEADER_PATTERNS = [
+    r"(?i)(financial highlights|selected financial data|consolidated statements of operations|item 6\. selected financial data|item 8\. financial statements)",
+    r"(?i)(business overview|management's discussion|executive summary|item 1\. business|item 7\. management's discussion and analysis)",
+    r"(?i)(risk factors|risk and uncertainties|item 1a\. risk factors)",
+    r"(?i)(financial condition|results of operations|liquidity and capital resources|item 7\. management's discussion and analysis)",
+    r"(?i)(legal proceedings|item 3\. legal proceedings)",
+    r"(?i)(market risk|item 7a\. quantitative and qualitative disclosures about market risk)",
+    r"(?i)(controls and procedures|item 9a\. controls and procedures)",
+    r"(?i)(executive compensation|item 11\. executive compensation)",
+    r"(?i)(security ownership|item 12\. security ownership)",
+    r"(?i)(related party transactions|item 13\. related party transactions)",
+]
+LEGACY_NEXT_SECTION_PATTERNS = [
+    r"(?i)(financial highlights|selected financial data|consolidated statements of operations)",
+    r"(?i)(business overview|management's discussion|executive summary)",
+    r"(?i)(risk factors|risk and uncertainties)",
+    r"(?i)(financial condition|results of operations|liquidity and capital resources)",
+    r"(?i)(legal proceedings)",
+    r"(?i)(market risk)",
+    r"(?i)(controls and procedures)",
+    r"(?i)(executive compensation)",
+    r"(?i)(security ownership)",
+    r"(?i)(related party transactions)",
+]
+
+
+def legacy_extract_section(text, pattern):
+    match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return None
+    start_pos = match.start()
+    next_section_pos = len(text)
+    for next_pattern in LEGACY_NEXT_SECTION_PATTERNS:
+        next_match = re.search(next_pattern, text[start_pos + 1 :], re.IGNORECASE)
+        if next_match and next_match.start() < next_section_pos:
+            next_section_pos = next_match.start()
+    return text[start_pos : start_pos + next_section_pos]
+
+
+class Command(BaseCommand):
+    """Custom Django management command to benchmark filing section extraction."""
+
+    help = "Compare the single-pass section segmenter with the previous per-section regex scans on the PDFs in edgar_files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--edgar-dir",
+            type=str,
+            default=EDGAR_DIR,
+            help="Directory containing the PDFs to benchmark on.",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="Timed repetitions per file (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        from investment_chat_app.summaries import FilingSummarizer
+
+        edgar_dir = options["edgar_dir"]
+        runs = options["runs"]
+        summarizer = FilingSummarizer()
+
+        filenames = sorted(f for f in os.listdir(edgar_dir) if f.endswith(".pdf"))
+        if not filenames:
+            self.stderr.write(self.style.WARNING(f"⚠️ No PDFs found in {edgar_dir}"))
+            return
+
+        legacy_total = single_pass_total = 0.0
+        for filename in filenames:
+            text = summarizer.extract_pdf_text(os.path.join(edgar_dir, filename))
+            if not text:
+                self.stderr.write(
+                    self.style.WARNING(f"⚠️ Could not extract text from {filename}")
+                )
+                continue
+
+            legacy_times = []
+            single_pass_times = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                legacy = [
+                    legacy_extract_section(text, p) for p in LEGACY_HEADER_PATTERNS
+                ]
+                legacy_times.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                spans = find_sections(text)
+                single_pass_times.append(time.perf_counter() - started)
+
+            legacy_seconds = statistics.median(legacy_times)
+            single_pass_seconds = statistics.median(single_pass_times)
+            legacy_total += legacy_seconds
+            single_pass_total += single_pass_seconds
+            self.stdout.write(
+                f"{filename}: {len(text):,} chars, "
+                f"legacy {legacy_seconds * 1000:.1f}ms "
+                f"({sum(1 for s in legacy if s)} sections), "
+                f"single pass {single_pass_seconds * 1000:.1f}ms "
+                f"({len(spans)}/{len(SECTION_HEADERS)} sections)"
+            )
+
+        if single_pass_total:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Total: legacy {legacy_total * 1000:.1f}ms, "
+                    f"single pass {single_pass_total * 1000:.1f}ms "
+                    f"({legacy_total / single_pass_total:.1f}x faster)"
+                )
+            )
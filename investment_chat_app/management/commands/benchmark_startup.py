@@ -0,0 +1,100 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+HEAVY_MODULES = ["torch", "sentence_transformers", "chromadb", "openai", "sklearn"]
+
+STARTUP_SCRIPT = """
+import json
+import sys
+import time
+
+started = time.perf_counter()
+import django
+
+django.setup()
+import investment_chat_project.urls  # noqa: F401
+
+result = {{"import_seconds": time.perf_counter() - started}}
+result["heavy_modules"] = [m for m in {heavy_modules!r} if m in sys.modules]
+
+if {warm_up!r}:
+    from investment_chat_app.clients import warm_up
+
+    started = time.perf_counter()
+    warm_up()
+    result["warm_up_seconds"] = time.perf_counter() - started
+
+print(json.dumps(result))
+"""
+
+
+class Command(BaseCommand):
+    """Custom Django management command to measure worker boot time."""
+
+    help = "Measure how long a fresh process takes to load the URL configuration and which heavy ML modules it imports."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=3,
+            help="Number of fresh processes to time (default: 3).",
+        )
+        parser.add_argument(
+            "--warm-up",
+            action="store_true",
+            help="Also time the post-fork warm-up of models and clients.",
+        )
+
+    def handle(self, *args, **options):
+        script = STARTUP_SCRIPT.format(
+            heavy_modules=HEAVY_MODULES, warm_up=options["warm_up"]
+        )
+        env = dict(
+            os.environ, DJANGO_SETTINGS_MODULE=os.environ["DJANGO_SETTINGS_MODULE"]
+        )
+
+        results = []
+        for run in range(options["runs"]):
+            completed = subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=settings.BASE_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if completed.returncode != 0:
+                self.stderr.write(self.style.ERROR(f"❌ Run {run + 1} failed:"))
+                self.stderr.write(completed.stderr)
+                return
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        import_times = [r["import_seconds"] for r in results]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ URL conf import: median {statistics.median(import_times):.2f}s, "
+                f"min {min(import_times):.2f}s over {len(results)} runs"
+            )
+        )
+
+        heavy_modules = results[-1]["heavy_modules"]
+        if heavy_modules:
+            self.stdout.write(
+                self.style.WARNING(f"⚠️ Imported at boot: {', '.join(heavy_modules)}")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ No ML modules imported at boot"))
+
+        if options["warm_up"]:
+            warm_up_times = [r["warm_up_seconds"] for r in results]
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Warm-up: median {statistics.median(warm_up_times):.2f}s"
+                )
+            )
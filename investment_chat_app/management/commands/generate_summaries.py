@@ -0,0 +1,42 @@
+from django.core.management import BaseCommand
+
+from investment_chat_app.models import SECFilings
+from investment_chat_app.summaries import generate_pending_summaries
+
+
+class Command(BaseCommand):
+    """Custom Django management command to precompute SEC filing summaries."""
+
+    help = "Generate and store summaries for filings that have none, a failed or pending one, or one from an older summary version."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ticker", type=str, help="Only summarize filings for this ticker."
+        )
+        parser.add_argument(
+            "--year", type=int, help="Only summarize filings from this year."
+        )
+        parser.add_argument(
+            "--limit", type=int, help="Maximum number of filings to summarize."
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate summaries even if they are up to date.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = SECFilings.objects.all()
+        if options["ticker"]:
+            queryset = queryset.filter(ticker__iexact=options["ticker"])
+        if options["year"]:
+            queryset = queryset.filter(filing_date__year=options["year"])
+
+        counts = generate_pending_summaries(
+            queryset, force=options["force"], limit=options["limit"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Summaries generated: {counts.get('done', 0)}, failed: {counts.get('failed', 0)}"
+            )
+        )
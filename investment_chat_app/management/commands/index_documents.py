@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from investment_chat_app.indexing import (
+    EDGAR_DIR,
+    IndexingWorker,
+    load_documents_to_chromadb,
+    process_ingestion_queue,
+    verify_document_loading,
+)
+from investment_chat_app.ingestion_queue import requeue_stale_ingestion_jobs
+from investment_chat_app.vector_store import backfill_fiscal_years
+
+
+class Command(BaseCommand):
+    """Custom Django management command to index EDGAR PDFs into ChromaDB."""
+
+    help = "Index new or modified PDFs from the edgar_files directory and the download queue into the vector store, optionally watching for changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep running and index files as they are added, changed or removed.",
+        )
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Index the filings queued by sec_filings instead of the edgar directory, then exit.",
+        )
+        parser.add_argument(
+            "--backfill-years",
+            action="store_true",
+            help="Add fiscal_year and filing_year to chunks indexed before they were recorded, then exit.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds between directory polls in watch mode (default: 5).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of PDF extraction processes (default: INDEXING_WORKERS).",
+        )
+        parser.add_argument(
+            "--max-pending",
+            type=int,
+            default=None,
+            help="Maximum files extracted ahead of the writer (default: INDEXING_MAX_PENDING).",
+        )
+        parser.add_argument(
+            "--edgar-dir",
+            type=str,
+            default=EDGAR_DIR,
+            help="Directory containing the PDFs to index.",
+        )
+
+    def handle(self, *args, **options):
+        edgar_dir = options["edgar_dir"]
+        workers = options["workers"]
+        max_pending = options["max_pending"]
+
+        if options["backfill_years"]:
+            updated = backfill_fiscal_years()
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ Fiscal years added to {updated} chunks.")
+            )
+            return
+
+        if options["queue"]:
+            requeue_stale_ingestion_jobs(settings.INGESTION_JOB_TIMEOUT)
+            outcomes = process_ingestion_queue(workers, max_pending)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Queued files indexed: {outcomes['indexed']}, "
+                    f"unchanged: {outcomes['unchanged']}, failed: {outcomes['failed']}"
+                )
+            )
+            return
+
+        if not options["watch"]:
+            if not load_documents_to_chromadb(edgar_dir, workers, max_pending):
+                self.stderr.write(self.style.ERROR("❌ Document indexing failed."))
+                return
+            doc_count = verify_document_loading()
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ {doc_count} documents in collection.")
+            )
+            return
+
+        worker = IndexingWorker(edgar_dir=edgar_dir, poll_interval=options["interval"])
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Indexing worker watching {edgar_dir}")
+        )
+        try:
+            worker.run(workers, max_pending)
+        except KeyboardInterrupt:
+            worker.stop()
+            self.stdout.write(self.style.WARNING("⚠️ Indexing worker stopped."))
@@ -0,0 +1,214 @@
+import asyncio
+import itertools
+import statistics
+import time
+
+import httpx
+from django.core.management import BaseCommand, CommandError
+
+ENDPOINTS = {"sync": "/process_message/", "async": "/process_message/async/"}
+
+# Default questions vary company, metric and year, so the semantic answer
+# cache does not turn the test into a measurement of cache hits
+COMPANIES = [
+    "Apple",
+    "Microsoft",
+    "Amazon",
+    "Tesla",
+    "Adobe",
+    "Broadcom",
+    "Nvidia",
+    "Netflix",
+]
+METRICS = [
+    "revenue",
+    "net income",
+    "operating income",
+    "gross margin",
+    "research and development spending",
+    "diluted earnings per share",
+    "cash and cash equivalents",
+    "total assets",
+]
+YEARS = [2019, 2020, 2021, 2022, 2023]
+
+
+def default_messages():
+    """One distinct question per company, metric and year"""
+    return [
+        f"What was {company}'s {metric} in {year}?"
+        for year, metric, company in itertools.product(YEARS, METRICS, COMPANIES)
+    ]
+
+
+class Command(BaseCommand):
+    """Custom Django management command to load test the chat endpoints."""
+
+    help = "Send concurrent chat requests to the sync and async chat endpoints of a running server and compare latency and throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            type=str,
+            default="http://localhost:8000",
+            help="Server to test (default: http://localhost:8000).",
+        )
+        parser.add_argument(
+            "--token", type=str, required=True, help="JWT access token to send."
+        )
+        parser.add_argument(
+            "--endpoints",
+            type=str,
+            default="sync,async",
+            help="Comma-separated endpoints to test: sync, async (default: both).",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=100,
+            help="Requests per endpoint (default: 100).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Requests in flight at once (default: 20).",
+        )
+        parser.add_argument(
+            "--message",
+            type=str,
+            help="Send this one chat message with every request of every endpoint, e.g. to measure answer cache hits.",
+        )
+        parser.add_argument(
+            "--messages-file",
+            type=str,
+            help="File with one chat message per line; each request sends a different one (default: built-in questions).",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=120.0,
+            help="Per-request timeout in seconds (default: 120).",
+        )
+
+    def handle(self, *args, **options):
+        endpoints = [e.strip() for e in options["endpoints"].split(",") if e.strip()]
+        unknown = [e for e in endpoints if e not in ENDPOINTS]
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(unknown)}")
+
+        messages = self.load_messages(options)
+        requests = options["requests"]
+        if options["message"]:
+            self.stderr.write(
+                self.style.WARNING(
+                    "⚠️ Every request sends the same message; all but the first are "
+                    "likely answered from the server's answer cache."
+                )
+            )
+            batches = [[options["message"]] * requests for _ in endpoints]
+        else:
+            # Each endpoint gets its own questions, so a later endpoint is not
+            # served from answers the earlier ones put in the cache
+            needed = requests * len(endpoints)
+            if needed > len(messages):
+                raise CommandError(
+                    f"{len(endpoints)} endpoints x {requests} requests need {needed} "
+                    f"distinct messages, only {len(messages)} available; pass a "
+                    "longer --messages-file or fewer --requests"
+                )
+            batches = [
+                messages[index * requests : (index + 1) * requests]
+                for index in range(len(endpoints))
+            ]
+
+        for endpoint, batch in zip(endpoints, batches):
+            result = asyncio.run(self.run_endpoint(endpoint, batch, options))
+            self.report(endpoint, result)
+
+    def load_messages(self, options):
+        if options["messages_file"]:
+            try:
+                with open(options["messages_file"], "r", encoding="utf-8") as file:
+                    messages = list(
+                        dict.fromkeys(line.strip() for line in file if line.strip())
+                    )
+            except OSError as e:
+                raise CommandError(f"Cannot read messages file: {str(e)}")
+            if not messages:
+                raise CommandError("Messages file is empty")
+            return messages
+        return default_messages()
+
+    async def run_endpoint(self, endpoint, messages, options):
+        url = options["base_url"].rstrip("/") + ENDPOINTS[endpoint]
+        headers = {"Authorization": f"Bearer {options['token']}"}
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        limits = httpx.Limits(max_connections=options["concurrency"])
+        latencies = []
+        cached_latencies = []
+        errors = 0
+
+        async with httpx.AsyncClient(
+            headers=headers, limits=limits, timeout=options["timeout"]
+        ) as client:
+
+            async def send(message):
+                nonlocal errors
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.post(url, json={"message": message})
+                        response.raise_for_status()
+                    except httpx.HTTPError:
+                        errors += 1
+                        return
+                    latency = time.perf_counter() - started
+                    if response.headers.get("X-Answer-Cache") == "hit":
+                        cached_latencies.append(latency)
+                    else:
+                        latencies.append(latency)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(send(message) for message in messages))
+            wall_seconds = time.perf_counter() - started
+
+        return {
+            "latencies": latencies,
+            "cached_latencies": cached_latencies,
+            "errors": errors,
+            "wall_seconds": wall_seconds,
+        }
+
+    def report(self, endpoint, result):
+        cached = result["cached_latencies"]
+        completed = len(result["latencies"]) + len(cached)
+        if not completed:
+            self.stderr.write(
+                self.style.ERROR(
+                    f"❌ {endpoint}: all {result['errors']} requests failed."
+                )
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {endpoint}: {completed} ok, {result['errors']} failed, "
+                f"{completed / result['wall_seconds']:.1f} req/s, "
+                f"answer cache hits {len(cached)}/{completed} "
+                f"({len(cached) / completed:.0%})"
+            )
+        )
+        # Cache hits skip OpenAI entirely, so their latencies are reported apart
+        for label, latencies in (("uncached", result["latencies"]), ("cached", cached)):
+            if latencies:
+                self.stdout.write(f"   {label}: {self.format_latencies(latencies)}")
+
+    @staticmethod
+    def format_latencies(latencies):
+        latencies = sorted(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return (
+            f"{len(latencies)} requests, p50 {statistics.median(latencies):.2f}s, "
+            f"p95 {p95:.2f}s, max {latencies[-1]:.2f}s"
+        )
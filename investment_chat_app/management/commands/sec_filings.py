@@ -1,160 +1,649 @@
-import csv
+import argparse
 import os
-import requests
+import time
 
-from datetime import datetime
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
 
-from investment_chat_app.models import SECFilings
+from investment_chat_app.ingestion_queue import document_path, enqueue_filings
+from investment_chat_app.models import FilingFetch, SECFilings
+from investment_chat_app.sec_client import SECClient
+from investment_chat_app.summaries import (
+    generate_pending_summaries,
+    mark_summaries_pending,
+)
+from investment_chat_app.utils.downloads import DOWNLOAD_CHUNK_SIZE, write_atomically
+from investment_chat_app.utils.filings import load_constituents
+from investment_chat_app.utils.fingerprint import new_hasher
 
-SEC_API_URL = settings.SEC_API_URL
-SEC_API_KEY = settings.SEC_API_KEY
-PDF_SAVE_PATH = "investment_chat_app/SEC_FILINGS"
-PDF_CONV_URL = settings.PDF_CONV_URL
+PDF_SAVE_PATH = settings.SEC_FILINGS_DIR
+
+# sec-api returns at most this many results for one query, however it is paged
+SEARCH_RESULT_LIMIT = 10000
+
+# One unit of work: a ticker's filings of one form type in one year
+WorkItem = namedtuple("WorkItem", ["ticker", "form_type", "year"])
+
+# Stands in for a download when a stored filing is known to be current
+UNCHANGED = object()
+
+# Stands in for the search results of a year --since skipped without
+# searching, because it ends before the latest stored filing
+SKIPPED = object()
+
+# Outcome of one PDF download; ``status_code`` is None when the transfer failed
+Download = namedtuple(
+    "Download",
+    ["status_code", "path", "size", "file_hash", "etag", "error"],
+    defaults=(None, 0, "", "", ""),
+)
+
+
+# Columns refreshed when a downloaded filing's (ticker, form_type, filing_date)
+# exists
+FILING_UPDATE_FIELDS = [
+    "path_to_doc",
+    "accession_no",
+    "etag",
+    "file_size",
+    "file_hash",
+    "period_of_report",
+]
+
+
+def filing_path(ticker, form_type, year, filing_date):
+    """Where a filing's PDF is stored: SEC_FILINGS/<ticker>/<year>/<form>/"""
+    # Amendments such as 10-K/A would otherwise nest directories and leave
+    # basenames like A_2023-02-03.pdf shared by every ticker
+    form_type = form_type.replace("/", "-")
+    return os.path.join(
+        PDF_SAVE_PATH,
+        ticker,
+        str(year),
+        form_type,
+        f"{ticker}_{form_type}_{filing_date.isoformat()}.pdf",
+    )
+
+
+def parse_years(value):
+    """argparse type for --year: a year or an inclusive range such as 2015-2024"""
+    start, _, end = value.partition("-")
+    try:
+        years = range(int(start), int(end or start) + 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid year or year range: {value!r}")
+    if not years:
+        raise argparse.ArgumentTypeError(f"empty year range: {value!r}")
+    return years
+
+
+def period_of_report(filing):
+    """End of the period a search result reports on, or None if it is missing"""
+    try:
+        return date.fromisoformat((filing.get("periodOfReport") or "")[:10])
+    except ValueError:
+        return None
+
+
+def stored_file_size(path):
+    """Size of a previously downloaded file, or None if it is missing"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
 
 
 class Command(BaseCommand):
     """Custom Django management command to fetch and download SEC filings."""
 
-    help = "Fetch and download SEC filings for S&P 500 companies from a CSV file and store metadata in the database."
+    help = "Fetch and download SEC filings of one or more form types and years for S&P 500 companies from a CSV file, optionally narrowed to tickers or sectors, and store metadata in the database."
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--form-type",
-            type=str,
-            default="10-K",
-            help="Type of filing to fetch (default: 10-K).",
+            dest="form_types",
+            nargs="+",
+            default=["10-K"],
+            help="Types of filing to fetch, e.g. 10-K 10-Q 8-K (default: 10-K).",
         )
         parser.add_argument(
             "--year",
+            dest="years",
+            nargs="+",
+            type=parse_years,
+            default=[parse_years(str(datetime.now().year))],
+            help="Years of the filings to fetch, each a year or a range such as 2015-2024 (default: the current year).",
+        )
+        parser.add_argument(
+            "--tickers",
+            nargs="+",
+            help="Only fetch these tickers from the constituents CSV.",
+        )
+        parser.add_argument(
+            "--sector",
+            dest="sectors",
+            nargs="+",
+            help='Only fetch companies in these GICS sectors, e.g. "Information Technology".',
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.SEC_DOWNLOAD_CONCURRENCY,
+            help="Number of (ticker, form type, year) fetches run in parallel (default: SEC_DOWNLOAD_CONCURRENCY).",
+        )
+        parser.add_argument(
+            "--since",
+            action="store_true",
+            help="Re-check every ticker but only for filings from its latest stored filing date on.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Ignore the fetch journal and re-download every filing.",
+        )
+        parser.add_argument(
+            "--batch-size",
             type=int,
-            default=datetime.now().year,
-            help="Year of the filing to fetch (default: 2020).",
+            default=settings.SEC_FILINGS_BATCH_SIZE,
+            help="Filings saved per database transaction (default: SEC_FILINGS_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--skip-indexing",
+            action="store_true",
+            help="Do not queue downloaded filings for indexing into the chat vector store.",
+        )
+        parser.add_argument(
+            "--skip-summaries",
+            action="store_true",
+            help="Only queue summaries for downloaded filings instead of generating them now.",
         )
 
     def handle(self, *args, **options):
-        form_type = options["form_type"]
-        year = options["year"]
+        form_types = list(
+            dict.fromkeys(form_type.upper() for form_type in options["form_types"])
+        )
+        years = sorted({year for span in options["years"] for year in span})
 
         os.makedirs(PDF_SAVE_PATH, exist_ok=True)
+        self.downloaded_filings = []
+        # Rows collected from finished work and upserted in batches
+        self.batch_size = options["batch_size"]
+        self.enqueue_downloads = not options["skip_indexing"]
+        self.pending_filings = {}
+        self.pending_fetches = {}
+        self.batch_timings = []
 
-        file_path = os.path.join(
-            settings.BASE_DIR, "investment_chat_app/utils/constituents.csv"
-        )
-        with open(file_path, "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                ticker = row.get("Symbol")
+        tickers = self.select_tickers(options["tickers"], options["sectors"])
+        work, incremental = self.plan_work(tickers, form_types, years, options)
+
+        # Filings already on disk, for conditional re-downloads
+        known = {}
+        if not options["force"]:
+            known = {
+                (filing.ticker, filing.form_type, filing.filing_date): filing
+                for filing in SECFilings.objects.filter(
+                    filing_date__year__in=years
+                ).only(
+                    "ticker",
+                    "form_type",
+                    "filing_date",
+                    "path_to_doc",
+                    "accession_no",
+                    "etag",
+                    "file_size",
+                )
+            }
 
-                if not ticker:
+        latest = {}
+        if options["since"] or incremental:
+            latest = {
+                (ticker, form_type): latest_date
+                for ticker, form_type, latest_date in SECFilings.objects.filter(
+                    form_type__in=form_types
+                )
+                .values("ticker", "form_type")
+                .annotate(latest=Max("filing_date"))
+                .values_list("ticker", "form_type", "latest")
+            }
+
+        # Network work runs on the pool; files and database rows are written
+        # here as each item completes
+        client = SECClient.from_settings(pool_size=options["concurrency"])
+        results = Counter()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=options["concurrency"], thread_name_prefix="sec"
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self.fetch_work,
+                    client,
+                    item,
+                    latest.get((item.ticker, item.form_type))
+                    if options["since"] or item in incremental
+                    else None,
+                    known,
+                ): item
+                for item in work
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    filings, downloads = future.result()
+                except Exception as e:
                     self.stderr.write(
-                        self.style.WARNING("⚠️ Skipping row with missing ticker.")
+                        self.style.ERROR(
+                            f"❌ Error fetching {item.ticker} ({item.form_type}, {item.year}): {str(e)}"
+                        )
                     )
+                    self.record_fetch(item, None, [], str(e))
+                    continue
+
+                if filings is SKIPPED:
+                    # Not searched, so not journaled: later runs still fetch it
+                    results["skipped"] += 1
                     continue
 
                 self.stdout.write(
-                    self.style.SUCCESS(f"✅ Processing {ticker} ({form_type}, {year})")
+                    self.style.SUCCESS(
+                        f"✅ Processed {item.ticker} ({item.form_type}, {item.year})"
+                    )
                 )
-
-                filings = self.fetch_sec_filings(ticker, form_type, year)
-
-                if filings:
-                    for filing in filings:
-                        self.download_and_store_filing(filing, ticker, form_type, year)
-                else:
+                if filings == []:
                     self.stderr.write(
-                        self.style.WARNING(f"⚠️ No filings found for {ticker}.")
+                        self.style.WARNING(
+                            f"⚠️ No {item.form_type} filings found for {item.ticker} in {item.year}."
+                        )
                     )
+                outcomes = [
+                    self.store_filing(filing, download, item.form_type)
+                    for filing, download in downloads
+                ]
+                results.update(outcomes)
+                self.record_fetch(item, filings, outcomes)
+                if (
+                    len(self.pending_filings) >= self.batch_size
+                    or len(self.pending_fetches) >= self.batch_size
+                ):
+                    self.flush()
 
-    def fetch_sec_filings(self, ticker, form_type, year):
-        """Fetch SEC Filings for a given ticker, form type, and year."""
-        query = {
-            "query": {
-                "query_string": {
-                    "query": f'ticker:{ticker} AND formType:"{form_type}" AND filedAt:[{year}-01-01 TO {year}-12-31]'
-                }
-            },
-            "from": 0,
-            "size": 5,
-            "sort": [{"filedAt": {"order": "desc"}}],
-        }
+        self.flush()
 
-        response = requests.post(
-            SEC_API_URL, json=query, headers={"Authorization": SEC_API_KEY}
+        stats = client.stats()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Fetched {len(work)} ticker/form/year combinations in {time.perf_counter() - started:.1f}s: "
+                f"{stats['requests']} requests, {stats['retries']} retries, "
+                f"{stats['throttled_seconds']:.1f}s waiting on the rate limit"
+            )
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Downloaded: {results['downloaded']}, unchanged: {results['unchanged']}, "
+                f"failed: {results['failed']}"
+            )
         )
+        if results["skipped"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Skipped {results['skipped']} combinations before the latest "
+                    "stored filing (--since)"
+                )
+            )
+        if self.batch_timings:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Database writes: {len(self.batch_timings)} batches in "
+                    f"{sum(self.batch_timings):.2f}s (slowest {max(self.batch_timings):.2f}s)"
+                )
+            )
 
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("filings", [])
-        else:
-            self.stderr.write(
-                self.style.ERROR(
-                    f"❌ Failed to fetch filings for {ticker}. Status Code: {response.status_code}"
+        # Queue summaries for everything downloaded in this run and, unless
+        # told otherwise, generate them so /api/forms/ never has to
+        mark_summaries_pending(self.downloaded_filings)
+        if self.downloaded_filings and not options["skip_summaries"]:
+            counts = generate_pending_summaries(
+                SECFilings.objects.filter(
+                    pk__in=[filing.pk for filing in self.downloaded_filings]
+                )
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Summaries generated: {counts.get('done', 0)}, failed: {counts.get('failed', 0)}"
                 )
             )
-            return None
 
-    def download_and_store_filing(self, filing, ticker, form_type, year):
-        """Downloads the filing PDF and stores metadata in the database."""
-        filing_url = filing.get("linkToFilingDetails")
-        ticker = filing.get("ticker")
-        filing_date = filing.get("filedAt")
+    def select_tickers(self, tickers=None, sectors=None):
+        """Tickers from constituents.csv, narrowed to ``tickers`` and GICS ``sectors``"""
+        rows = load_constituents()
+        if sectors:
+            available = {row.get("GICS Sector", "") for row in rows}
+            by_name = {sector.lower(): sector for sector in available}
+            unknown = [sector for sector in sectors if sector.lower() not in by_name]
+            if unknown:
+                raise CommandError(
+                    f"Unknown sectors: {', '.join(unknown)}. "
+                    f"Choose from: {', '.join(sorted(filter(None, available)))}"
+                )
+            sectors = {by_name[sector.lower()] for sector in sectors}
 
-        if not filing_url:
-            self.stderr.write(
-                self.style.WARNING(f"Skipping {ticker}: No filing URL found.")
-            )
-            return
+        selected = []
+        for row in rows:
+            ticker = row.get("Symbol")
 
-        # Convert filing to PDF
-        pdf_conv_url = (
-            f"https://api.sec-api.io/filing-reader?token={SEC_API_KEY}&url={filing_url}"
-        )
-        response = requests.get(pdf_conv_url)
+            if not ticker:
+                self.stderr.write(
+                    self.style.WARNING("⚠️ Skipping row with missing ticker.")
+                )
+                continue
+            if sectors and row.get("GICS Sector") not in sectors:
+                continue
+            selected.append(ticker)
 
-        save_dir = os.path.join(PDF_SAVE_PATH, ticker, str(year), form_type)
-        os.makedirs(save_dir, exist_ok=True)
+        if tickers:
+            requested = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+            missing = [ticker for ticker in requested if ticker not in selected]
+            if missing:
+                self.stderr.write(
+                    self.style.WARNING(
+                        f"⚠️ Skipping tickers not in the selected constituents: {', '.join(missing)}"
+                    )
+                )
+            selected = [ticker for ticker in requested if ticker in selected]
+        return list(dict.fromkeys(selected))
 
-        if response.status_code == 200:
-            # Format filing_date to include only the date part
-            filing_date_formatted = datetime.strptime(
-                filing_date[:10], "%Y-%m-%d"
-            ).strftime("%Y-%m-%d")
-            file_name = f"{ticker}_{form_type}_{filing_date_formatted}.pdf"
-            file_path = os.path.join(save_dir, file_name)
+    def plan_work(self, tickers, form_types, years, options):
+        """
+        Build the (ticker, form type, year) work list for this run.
 
-            with open(file_path, "wb") as pdf_file:
-                pdf_file.write(response.content)
+        Each combination appears once. The journal records finished work, so
+        re-runs and runs resumed after an interruption skip what is already
+        done unless --force or --since is given. Only past years can be
+        finished: done entries for the current year are re-checked from the
+        latest stored filing on. Returns ``(work, incremental)`` where
+        ``incremental`` is the set of items to re-check that way.
+        """
+        work = [
+            WorkItem(ticker, form_type, year)
+            for ticker in tickers
+            for form_type in form_types
+            for year in years
+        ]
+        current_year = date.today().year
+        incremental = set()
+        if not (options["force"] or options["since"]):
+            done = {
+                WorkItem(*key)
+                for key in FilingFetch.objects.filter(
+                    form_type__in=form_types,
+                    year__in=years,
+                    status=FilingFetch.STATUS_DONE,
+                ).values_list("ticker", "form_type", "year")
+            }
+            # New filings keep arriving until the year is over
+            incremental = {item for item in done if item.year >= current_year}
+            planned = len(work)
+            work = [item for item in work if item not in done - incremental]
+            if planned > len(work):
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"✅ Skipping {planned - len(work)} combinations already fetched"
+                    )
+                )
 
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Planned {len(work)} fetches: {len(tickers)} tickers, "
+                f"form types {', '.join(form_types)}, "
+                f"years {years[0]}-{years[-1]}"
+            )
+        )
+        if incremental:
             self.stdout.write(
-                self.style.SUCCESS(f"PDF downloaded successfully: {file_path}")
+                self.style.SUCCESS(
+                    f"✅ Re-checking {len(incremental)} combinations for "
+                    f"{current_year} filings since the last fetch"
+                )
             )
+        return work, incremental
+
+    def fetch_work(self, client, item, latest, known):
+        """
+        Search and download one ticker's filings of one form type and year;
+        runs on a worker thread.
+
+        Returns ``(filings, downloads)`` where ``filings`` is None when the
+        search failed or SKIPPED when the year ends before ``latest``, and
+        ``downloads`` pairs each filing with its Download:
+        None when the filing has no URL and UNCHANGED when the stored copy
+        has the same accession number and is intact on disk. Intact copies
+        with a stored ETag are re-fetched conditionally.
+        """
+        ticker, form_type, year = item
+        start = date(year, 1, 1)
+        if latest is not None:
+            # Inclusive, so a filing made later on the same day is not
+            # missed; the stored ones come back unchanged
+            start = max(start, latest)
+        if start > date(year, 12, 31):
+            return SKIPPED, []
 
-            filing_date = datetime.strptime(filing_date[:10], "%Y-%m-%d").date()
+        filings = self.fetch_sec_filings(client, ticker, form_type, year, start)
+        downloads = []
+        for filing in filings or []:
+            filing_url = filing.get("linkToFilingDetails")
+            if not filing_url:
+                downloads.append((filing, None))
+                continue
 
-            # Store metadata in the database
-            sec_filing, created = SECFilings.objects.update_or_create(
-                ticker=ticker,
-                filing_date=filing_date,
-                defaults={"form_type": form_type, "path_to_doc": file_path},
+            filing_date = datetime.strptime(filing["filedAt"][:10], "%Y-%m-%d").date()
+            existing = known.get((filing.get("ticker"), form_type, filing_date))
+            intact = (
+                existing is not None
+                and existing.file_size > 0
+                and stored_file_size(document_path(existing.path_to_doc))
+                == existing.file_size
             )
-            if created:
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"✅ Created new entry for {ticker} ({form_type}, {filing_date})"
-                    )
+            if intact and existing.accession_no == filing.get("accessionNo"):
+                downloads.append((filing, UNCHANGED))
+                continue
+
+            path = filing_path(filing.get("ticker"), form_type, year, filing_date)
+            etag = existing.etag if intact else None
+            downloads.append(
+                (filing, self.download_filing(client, filing_url, path, etag))
+            )
+        return filings, downloads
+
+    def download_filing(self, client, filing_url, path, etag=None):
+        """
+        Stream a filing PDF to ``path``; runs on a worker thread.
+
+        The file is written atomically and hashed as it arrives, so only one
+        chunk per download is held in memory and an interrupted transfer
+        never leaves a truncated PDF behind.
+        """
+        try:
+            with client.download_filing(filing_url, etag) as response:
+                if response.status_code != 200:
+                    return Download(response.status_code)
+                size, file_hash = write_atomically(
+                    response.iter_content(DOWNLOAD_CHUNK_SIZE), path, new_hasher()
                 )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"⚠️ Updated existing entry for {ticker} ({form_type}, {filing_date})"
+                return Download(
+                    200, path, size, file_hash, response.headers.get("ETag", "")
+                )
+        except Exception as e:
+            return Download(None, error=client.redact(str(e)))
+
+    def fetch_sec_filings(self, client, ticker, form_type, year, start=None):
+        """
+        Fetch SEC Filings for a given ticker, form type, and year, filed on or after ``start``.
+
+        Results are paged through with ``from`` until the search is
+        exhausted. Returns None when any page fails, so the journal records
+        the whole search as failed and a later run retries it.
+        """
+        start = start or date(year, 1, 1)
+        page_size = settings.SEC_API_PAGE_SIZE
+        filings = []
+        seen = set()
+        offset = 0
+        while offset < SEARCH_RESULT_LIMIT:
+            query = {
+                "query": {
+                    "query_string": {
+                        "query": f'ticker:{ticker} AND formType:"{form_type}" AND filedAt:[{start.isoformat()} TO {year}-12-31]'
+                    }
+                },
+                "from": offset,
+                "size": page_size,
+                "sort": [{"filedAt": {"order": "desc"}}],
+            }
+
+            response = client.search_filings(query)
+
+            if response.status_code != 200:
+                self.stderr.write(
+                    self.style.ERROR(
+                        f"❌ Failed to fetch filings for {ticker}. Status Code: {response.status_code}"
                     )
                 )
+                return None
+
+            data = response.json()
+            page = data.get("filings", [])
+            for filing in page:
+                # A filing indexed mid-search shifts later pages, so the
+                # same result can come back twice
+                accession_no = filing.get("accessionNo")
+                if accession_no in seen:
+                    continue
+                if accession_no:
+                    seen.add(accession_no)
+                filings.append(filing)
+
+            offset += len(page)
+            total = (data.get("total") or {}).get("value")
+            if len(page) < page_size or (total is not None and offset >= total):
+                break
+        return filings
+
+    def store_filing(self, filing, download, form_type):
+        """
+        Stores metadata of a downloaded filing PDF in the database.
 
-        else:
+        Returns "downloaded", "unchanged", "skipped" or "failed".
+        """
+        ticker = filing.get("ticker")
+        filing_date = filing.get("filedAt")
+
+        if download is None:
             self.stderr.write(
-                self.style.ERROR(
-                    f"❌ Failed to download PDF for {ticker}. Status Code: {response.status_code}"
+                self.style.WARNING(f"Skipping {ticker}: No filing URL found.")
+            )
+            return "skipped"
+
+        filing_date = datetime.strptime(filing_date[:10], "%Y-%m-%d").date()
+
+        if download is UNCHANGED or download.status_code == 304:
+            if download is not UNCHANGED:
+                # Same document as the stored copy, which may predate the
+                # accession number being recorded
+                SECFilings.objects.filter(
+                    ticker=ticker, form_type=form_type, filing_date=filing_date
+                ).update(accession_no=filing.get("accessionNo", ""))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Up to date: {ticker} ({form_type}, {filing_date})"
                 )
             )
+            return "unchanged"
+
+        if download.status_code != 200:
+            reason = download.error or f"Status Code: {download.status_code}"
+            self.stderr.write(
+                self.style.ERROR(f"❌ Failed to download PDF for {ticker}. {reason}")
+            )
+            return "failed"
+
+        self.stdout.write(
+            self.style.SUCCESS(f"PDF downloaded successfully: {download.path}")
+        )
+
+        # Metadata is saved with the next batch
+        self.pending_filings[(ticker, form_type, filing_date)] = SECFilings(
+            ticker=ticker,
+            filing_date=filing_date,
+            form_type=form_type,
+            path_to_doc=download.path,
+            accession_no=filing.get("accessionNo", ""),
+            etag=download.etag,
+            file_size=download.size,
+            file_hash=download.file_hash,
+            period_of_report=period_of_report(filing),
+        )
+        return "downloaded"
+
+    def record_fetch(self, item, filings, outcomes, error=""):
+        """Journal the outcome of one work item so later runs can skip or retry it"""
+        failed = outcomes.count("failed")
+        if filings is None:
+            error = error or "Filing search failed"
+        elif failed:
+            error = f"{failed} of {len(outcomes)} downloads failed"
+
+        self.pending_fetches[item] = FilingFetch(
+            ticker=item.ticker,
+            form_type=item.form_type,
+            year=item.year,
+            status=FilingFetch.STATUS_FAILED if error else FilingFetch.STATUS_DONE,
+            filings_found=len(filings or []),
+            error=error,
+        )
+
+    def flush(self):
+        """
+        Upsert collected filings and journal entries in one transaction.
+
+        Journal entries and ingestion jobs are written together with the
+        filings they cover, so a ticker is never marked done before its rows
+        are saved and queued for indexing.
+        """
+        if not (self.pending_filings or self.pending_fetches):
+            return
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            filings = SECFilings.objects.bulk_create(
+                list(self.pending_filings.values()),
+                update_conflicts=True,
+                unique_fields=["ticker", "form_type", "filing_date"],
+                update_fields=FILING_UPDATE_FIELDS,
+            )
+            FilingFetch.objects.bulk_create(
+                list(self.pending_fetches.values()),
+                update_conflicts=True,
+                unique_fields=["ticker", "form_type", "year"],
+                update_fields=["status", "filings_found", "error", "fetched_at"],
+            )
+            # Each download becomes an ingestion job for the indexing worker
+            if self.enqueue_downloads:
+                enqueue_filings(filings)
+        elapsed = time.perf_counter() - started
+
+        self.batch_timings.append(elapsed)
+        self.downloaded_filings.extend(filings)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Saved {len(filings)} filings and {len(self.pending_fetches)} "
+                f"journal entries in {elapsed * 1000:.0f}ms"
+            )
+        )
+        self.pending_filings = {}
+        self.pending_fetches = {}
@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-16 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("investment_chat_app", "0003_alter_secfilings_ticker_and_more")]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexedDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=255, unique=True)),
+                ("file_hash", models.CharField(max_length=128)),
+                ("file_size", models.BigIntegerField(default=0)),
+                ("file_mtime", models.FloatField(default=0)),
+                ("page_count", models.PositiveIntegerField(default=0)),
+                ("chunk_count", models.PositiveIntegerField(default=0)),
+                ("processed_date", models.DateTimeField()),
+            ],
+        )
+    ]
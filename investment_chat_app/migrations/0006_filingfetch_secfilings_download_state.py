@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-17 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("investment_chat_app", "0005_filingsummary")]
+
+    operations = [
+        migrations.AddField(
+            model_name="secfilings",
+            name="accession_no",
+            field=models.CharField(blank=True, max_length=25),
+        ),
+        migrations.AddField(
+            model_name="secfilings",
+            name="etag",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="secfilings",
+            name="file_size",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="FilingFetch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=10)),
+                ("form_type", models.CharField(max_length=10)),
+                ("year", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("done", "Done"), ("failed", "Failed")], max_length=10
+                    ),
+                ),
+                ("filings_found", models.PositiveIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                ("fetched_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={"unique_together": {("ticker", "form_type", "year")}},
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-17 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("investment_chat_app", "0006_filingfetch_secfilings_download_state")
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="secfilings",
+            name="file_hash",
+            field=models.CharField(blank=True, max_length=128),
+        )
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1 on 2026-10-17 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("investment_chat_app", "0007_secfilings_file_hash")]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestionJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=255, unique=True)),
+                ("path", models.CharField(max_length=500)),
+                ("file_hash", models.CharField(blank=True, max_length=128)),
+                ("file_size", models.BigIntegerField(default=0)),
+                ("ticker", models.CharField(blank=True, max_length=10)),
+                ("form_type", models.CharField(blank=True, max_length=10)),
+                ("filing_date", models.DateField(blank=True, null=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="investment__status_7250f8_idx",
+                    )
+                ]
+            },
+        )
+    ]
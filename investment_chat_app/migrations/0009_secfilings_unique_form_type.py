@@ -0,0 +1,13 @@
+# Generated by Django 5.1 on 2026-10-17 00:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [("investment_chat_app", "0008_ingestionjob")]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="secfilings", unique_together={("ticker", "form_type", "filing_date")}
+        )
+    ]
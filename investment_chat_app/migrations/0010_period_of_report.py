@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-17 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("investment_chat_app", "0009_secfilings_unique_form_type")]
+
+    operations = [
+        migrations.AddField(
+            model_name="ingestionjob",
+            name="period_of_report",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="secfilings",
+            name="period_of_report",
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -13,6 +13,107 @@ class SECFilings(models.Model):
     form_type = models.CharField(max_length=10)
     filing_date = models.DateField()
     path_to_doc = models.URLField()
+    # What was downloaded, so re-runs can skip or conditionally re-fetch it
+    accession_no = models.CharField(max_length=25, blank=True)
+    etag = models.CharField(max_length=255, blank=True)
+    file_size = models.BigIntegerField(default=0)
+    # Content hash (DOCUMENT_HASH_ALGORITHM) computed while downloading
+    file_hash = models.CharField(max_length=128, blank=True)
+    # End of the reported period, which fixes the filing's fiscal year
+    period_of_report = models.DateField(null=True, blank=True)
 
     class Meta:
-        unique_together = ("ticker", "filing_date")
+        unique_together = ("ticker", "form_type", "filing_date")
+
+
+class FilingFetch(models.Model):
+    """Journal of sec_filings work, one row per (ticker, form type, year)."""
+
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [(STATUS_DONE, "Done"), (STATUS_FAILED, "Failed")]
+
+    ticker = models.CharField(max_length=10)
+    form_type = models.CharField(max_length=10)
+    year = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    filings_found = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    fetched_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("ticker", "form_type", "year")
+
+
+class IndexedDocument(models.Model):
+    """Per-file manifest of what has been written to the vector store."""
+
+    source = models.CharField(max_length=255, unique=True)
+    file_hash = models.CharField(max_length=128)
+    file_size = models.BigIntegerField(default=0)
+    file_mtime = models.FloatField(default=0)
+    page_count = models.PositiveIntegerField(default=0)
+    chunk_count = models.PositiveIntegerField(default=0)
+    processed_date = models.DateTimeField()
+
+
+class IngestionJob(models.Model):
+    """A downloaded document waiting to be chunked and embedded."""
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    # Document name in the vector store, as used for IndexedDocument.source
+    source = models.CharField(max_length=255, unique=True)
+    path = models.CharField(max_length=500)
+    file_hash = models.CharField(max_length=128, blank=True)
+    file_size = models.BigIntegerField(default=0)
+    # Carried into chunk metadata for filtered retrieval
+    ticker = models.CharField(max_length=10, blank=True)
+    form_type = models.CharField(max_length=10, blank=True)
+    filing_date = models.DateField(null=True, blank=True)
+    period_of_report = models.DateField(null=True, blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+
+class FilingSummary(models.Model):
+    """Precomputed GPT summary of an SEC filing."""
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    filing = models.OneToOneField(
+        SECFilings, on_delete=models.CASCADE, related_name="summary"
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    version = models.PositiveIntegerField(default=0)
+    summary = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+
+from django.conf import settings
+
+from investment_chat_app.utils.fingerprint import calculate_file_hash
+from investment_chat_app.utils.pdf import EXTRACTOR_VERSION, extract_pdf_pages
+
+logger = logging.getLogger(__name__)
+
+
+class PageTextCache:
+    """
+    Extracted PDF page text stored in SQLite, keyed by file content hash.
+
+    Each row holds the zlib-compressed JSON list of (page_number, text) pairs
+    for one file and extractor version, so indexing and summarization parse
+    a PDF once and re-indexing an unchanged file never re-parses it.
+    """
+
+    def __init__(self, path, extractor_version=EXTRACTOR_VERSION):
+        self.path = path
+        self.extractor_version = extractor_version
+        self._db = None
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0}
+
+    def _get_db(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "file_hash TEXT, extractor TEXT, pages BLOB, "
+                "PRIMARY KEY (file_hash, extractor))"
+            )
+        return self._db
+
+    def get(self, file_hash):
+        """Return the cached (page_number, text) pairs for a file, or None"""
+        with self._lock:
+            row = (
+                self._get_db()
+                .execute(
+                    "SELECT pages FROM pages WHERE file_hash = ? AND extractor = ?",
+                    (file_hash, self.extractor_version),
+                )
+                .fetchone()
+            )
+            self.counters["hits" if row else "misses"] += 1
+        if row is None:
+            return None
+        return [tuple(page) for page in json.loads(zlib.decompress(row[0]))]
+
+    def put(self, file_hash, pages):
+        """Store the extracted (page_number, text) pairs for a file"""
+        blob = zlib.compress(json.dumps(list(pages)).encode("utf-8"))
+        with self._lock:
+            db = self._get_db()
+            db.execute(
+                "INSERT OR REPLACE INTO pages (file_hash, extractor, pages) VALUES (?, ?, ?)",
+                (file_hash, self.extractor_version, blob),
+            )
+            db.commit()
+
+    def stats(self):
+        """Snapshot of hit and miss counters"""
+        with self._lock:
+            return dict(self.counters)
+
+
+_page_text_cache = None
+_page_text_cache_lock = threading.Lock()
+
+
+def get_page_text_cache():
+    """Return the process-wide PageTextCache, creating it on first use"""
+    global _page_text_cache
+    if _page_text_cache is None:
+        with _page_text_cache_lock:
+            if _page_text_cache is None:
+                _page_text_cache = PageTextCache(settings.PAGE_TEXT_CACHE_PATH)
+    return _page_text_cache
+
+
+def remember_pdf_pages(file_hash, pages):
+    """Store pages extracted elsewhere, e.g. in an ingestion worker process"""
+    try:
+        get_page_text_cache().put(file_hash, pages)
+    except Exception as e:
+        logger.error(f"Error writing page text cache: {str(e)}")
+
+
+def get_cached_pdf_pages(file_hash):
+    """Return cached pages for a file hash without extracting, or None"""
+    try:
+        return get_page_text_cache().get(file_hash)
+    except Exception as e:
+        logger.error(f"Error reading page text cache: {str(e)}")
+        return None
+
+
+def get_pdf_pages(file_path, file_hash=None):
+    """
+    Return (pages, seconds) for a PDF, extracting it only on a cache miss.
+
+    ``seconds`` is the time spent extracting, or 0.0 when the pages came from
+    the cache. The file is hashed here when ``file_hash`` is not given.
+    """
+    file_hash = file_hash or calculate_file_hash(file_path)
+    pages = get_cached_pdf_pages(file_hash)
+    if pages is not None:
+        return pages, 0.0
+
+    pages, seconds = extract_pdf_pages(file_path)
+    remember_pdf_pages(file_hash, pages)
+    return pages, seconds
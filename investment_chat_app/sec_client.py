@@ -0,0 +1,148 @@
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from investment_chat_app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limited or a transient server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SECClient:
+    """
+    Thread-safe client for the SEC search and filing-reader APIs.
+
+    All requests share one pooled session and one token bucket, so any
+    number of download threads together stay within the API quota. 429 and
+    5xx responses and connection errors are retried with exponential backoff
+    and jitter, honouring Retry-After when the server sends it.
+    """
+
+    def __init__(
+        self,
+        api_url,
+        api_key,
+        reader_url,
+        rate=5,
+        burst=None,
+        max_retries=5,
+        backoff=1.0,
+        timeout=60,
+        pool_size=10,
+    ):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.reader_url = reader_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "throttled_seconds": 0.0}
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        """Build a client from the SEC_API_* settings"""
+        options = {
+            "api_url": settings.SEC_API_URL,
+            "api_key": settings.SEC_API_KEY,
+            "reader_url": settings.PDF_CONV_URL,
+            "rate": settings.SEC_API_RATE_LIMIT,
+            "burst": settings.SEC_API_BURST,
+            "max_retries": settings.SEC_API_MAX_RETRIES,
+            "backoff": settings.SEC_API_BACKOFF_SECONDS,
+            "timeout": settings.SEC_API_TIMEOUT,
+            "pool_size": settings.SEC_DOWNLOAD_CONCURRENCY,
+        }
+        options.update(overrides)
+        return cls(**options)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _retry_delay(self, attempt, response):
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2**attempt * random.uniform(0.5, 1.0)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a rate-limited request and return the final response.
+
+        Retryable statuses are returned as-is once retries run out; connection
+        errors are re-raised.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        # The filing reader takes the API key in the query string, keep it out
+        # of the logs
+        label = f"{method} {url.split('?')[0]}"
+        for attempt in range(self.max_retries + 1):
+            self._count("throttled_seconds", self.bucket.acquire())
+            self._count("requests")
+            response = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                # The exception text repeats the URL, so only its type is logged
+                logger.warning(f"{label} failed ({type(e).__name__}), retrying")
+            else:
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt == self.max_retries
+                ):
+                    return response
+                logger.warning(f"{label} returned {response.status_code}, retrying")
+                response.close()
+
+            self._count("retries")
+            time.sleep(self._retry_delay(attempt, response))
+
+    def search_filings(self, query):
+        """POST a full-text query to the filings search API"""
+        return self.request(
+            "POST", self.api_url, json=query, headers={"Authorization": self.api_key}
+        )
+
+    def download_filing(self, filing_url, etag=None):
+        """
+        GET the PDF rendering of a filing from the filing reader.
+
+        The response is streamed; read it with ``iter_content`` and close it.
+        With ``etag`` the request is conditional and an unchanged filing comes
+        back as 304 Not Modified without a body.
+        """
+        return self.request(
+            "GET",
+            self.reader_url,
+            params={"token": self.api_key, "url": filing_url},
+            headers={"If-None-Match": etag} if etag else None,
+            stream=True,
+        )
+
+    def redact(self, message):
+        """Remove the API key from an error message that may quote a URL"""
+        return message.replace(self.api_key, "***") if self.api_key else message
+
+    def stats(self):
+        """Snapshot of request, retry and throttling counters"""
+        with self._lock:
+            return dict(self.counters)
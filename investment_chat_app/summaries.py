@@ -0,0 +1,407 @@
+import logging
+import os
+import re
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from investment_chat_app.clients import get_openai_client
+from investment_chat_app.embeddings import get_embedding_service
+from investment_chat_app.ingestion_queue import document_path
+from investment_chat_app.models import FilingSummary, SECFilings
+from investment_chat_app.page_cache import get_pdf_pages
+from investment_chat_app.utils.sections import SECTION_HEADERS, extract_sections
+from investment_chat_app.utils.text import PageCleaner, clean_document, clean_text
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever summary extraction or the prompt changes so stored summaries
+# are regenerated by the generate_summaries command
+SUMMARY_VERSION = 2
+
+# Fallback patterns for sections whose header was not found, compiled once
+_ALTERNATIVE_SECTION_PATTERNS = {
+    "financial_highlights": [
+        r"(?i)(revenue|net income|earnings per share|eps).*?\$?\d+",
+        r"(?i)(total revenue|net income|diluted earnings per share).*?\$?\d+",
+        r"(?i)(consolidated statements of operations).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "business_overview": [
+        r"(?i)(business overview|company overview|executive summary).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(our business|company description).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(management's discussion and analysis).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "risk_factors": [
+        r"(?i)(risk factors|principal risks).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(risks and uncertainties).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(item 1a\. risk factors).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "financial_condition": [
+        r"(?i)(financial condition|results of operations).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(liquidity and capital resources).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(item 7\. management's discussion and analysis).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "legal_proceedings": [
+        r"(?i)(legal proceedings|legal matters).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(item 3\. legal proceedings).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "market_risk": [
+        r"(?i)(market risk|financial instruments).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(item 7a\. quantitative and qualitative disclosures about market risk).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "controls": [
+        r"(?i)(controls and procedures|internal control).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(item 9a\. controls and procedures).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "executive_compensation": [
+        r"(?i)(executive compensation|compensation discussion and analysis).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(item 11\. executive compensation).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "security_ownership": [
+        r"(?i)(security ownership|beneficial ownership).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(item 12\. security ownership).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+    "related_party_transactions": [
+        r"(?i)(related party transactions|transactions with related persons).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+        r"(?i)(item 13\. related party transactions).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+    ],
+}
+ALTERNATIVE_SECTION_PATTERNS = {
+    section_name: [
+        re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in patterns
+    ]
+    for section_name, patterns in _ALTERNATIVE_SECTION_PATTERNS.items()
+}
+
+
+def mark_summaries_pending(filings, batch_size=500):
+    """Queue summary generation for the given SECFilings rows"""
+    FilingSummary.objects.bulk_create(
+        [
+            FilingSummary(filing=filing, status=FilingSummary.STATUS_PENDING)
+            for filing in filings
+        ],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["filing"],
+        update_fields=["status", "error", "updated_at"],
+    )
+
+
+def filings_needing_summaries(queryset=None, force=False):
+    """Filings with no summary, a pending or failed one, or an outdated version"""
+    queryset = queryset if queryset is not None else SECFilings.objects.all()
+    if force:
+        return queryset
+    return queryset.exclude(
+        summary__status=FilingSummary.STATUS_DONE, summary__version__gte=SUMMARY_VERSION
+    )
+
+
+def generate_summary_for_filing(filing, summarizer=None):
+    """Generate and store the summary for one SECFilings row"""
+    summarizer = summarizer or FilingSummarizer()
+    record, created = FilingSummary.objects.get_or_create(filing=filing)
+    record.status = FilingSummary.STATUS_RUNNING
+    record.save(update_fields=["status", "updated_at"])
+
+    try:
+        summary = summarizer.generate_quick_summary(
+            {
+                "ticker": filing.ticker,
+                "form_type": filing.form_type,
+                "filing_date": filing.filing_date,
+                "path_to_doc": filing.path_to_doc,
+                "file_hash": filing.file_hash,
+            }
+        )
+    except Exception as e:
+        summary = f"Summary generation failed: {str(e)}"
+
+    if summary.startswith(("Summary generation failed", "Cannot generate summary")):
+        record.status = FilingSummary.STATUS_FAILED
+        record.error = summary
+        record.summary = ""
+    else:
+        record.status = FilingSummary.STATUS_DONE
+        record.error = ""
+        record.summary = summary
+    record.version = SUMMARY_VERSION
+    record.save()
+    logger.info(
+        f"Summary for {filing.ticker} {filing.form_type} {filing.filing_date}: "
+        f"{record.status} at {timezone.now().isoformat()}"
+    )
+    return record
+
+
+def generate_pending_summaries(queryset=None, force=False, limit=None):
+    """Generate summaries for every filing that needs one; returns counts by status"""
+    summarizer = FilingSummarizer()
+    filings = filings_needing_summaries(queryset, force).order_by(
+        "ticker", "filing_date"
+    )
+    if limit:
+        filings = filings[:limit]
+
+    counts = {FilingSummary.STATUS_DONE: 0, FilingSummary.STATUS_FAILED: 0}
+    for filing in filings:
+        record = generate_summary_for_filing(filing, summarizer)
+        counts[record.status] = counts.get(record.status, 0) + 1
+    return counts
+
+
+class FilingSummarizer:
+    """Extracts key sections from a filing PDF and summarizes them with GPT"""
+
+    def __init__(self):
+        self.page_cleaner = PageCleaner(
+            clean_text, memo_size=settings.TEXT_CLEAN_MEMO_SIZE
+        )
+
+    def extract_relevant_sentences(self, text, query_embeddings, threshold=0.7):
+        """Extract sentences that are most relevant to the query using sentence transformers"""
+        # Split text into sentences
+        sentences = [s.strip() for s in text.split(".") if len(s.strip()) > 20]
+
+        # Get embeddings for all sentences
+        sentence_embeddings = get_embedding_service().encode(sentences)
+
+        # Calculate cosine similarity scores
+        query_embeddings = np.atleast_2d(query_embeddings)
+        similarities = (
+            query_embeddings / np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+        ) @ (
+            sentence_embeddings
+            / np.linalg.norm(sentence_embeddings, axis=1, keepdims=True)
+        ).T
+
+        # Get top relevant sentences
+        relevant_indices = np.where(similarities[0] > threshold)[0]
+        relevant_sentences = [sentences[i] for i in relevant_indices]
+
+        return relevant_sentences
+
+    def extract_pdf_text(self, file_path, file_hash=None):
+        """Extract and clean text from PDF with improved error handling"""
+        try:
+            # Reuse the pages the indexer already extracted when possible,
+            # and the hash recorded at download time instead of rehashing
+            pages, _ = get_pdf_pages(file_path, file_hash or None)
+            return clean_document(
+                (page_text for _, page_text in pages), self.page_cleaner
+            )
+        except Exception as e:
+            logger.error(f"Error extracting PDF text: {str(e)}")
+            return None
+
+    def extract_section_alternative(self, text, section_name):
+        """Alternative method to extract sections when standard method fails"""
+        try:
+            for pattern in ALTERNATIVE_SECTION_PATTERNS.get(section_name, []):
+                match = pattern.search(text)
+                if match:
+                    return match.group(0).strip()
+
+            return None
+        except Exception as e:
+            logger.error(f"Error in alternative section extraction: {str(e)}")
+            return None
+
+    def generate_quick_summary(self, filing):
+        """Generate a quick summary using sentence transformers and GPT"""
+        try:
+            file_path = document_path(filing["path_to_doc"])
+            if not os.path.exists(file_path):
+                return f"Cannot generate summary: File does not exist at {file_path}"
+
+            # Extract and clean text from PDF
+            text = self.extract_pdf_text(file_path, filing.get("file_hash"))
+            if not text:
+                return "Summary generation failed: Could not extract text from the document"
+
+            # For 10-K filings, try to extract information even if sections are not properly formatted
+            if filing["form_type"] == "10-K":
+                # Try to find financial data using direct patterns
+                financial_data = self.extract_financial_data(text)
+                if financial_data:
+                    text = financial_data + "\n\n" + text
+
+            # Locate every key section in a single scan of the text
+            sections = self.extract_sections(text)
+
+            # For 10-K filings, ensure we have all required sections
+            if filing["form_type"] == "10-K":
+                missing_sections = [k for k, v in sections.items() if not v]
+                if missing_sections:
+                    logger.warning(f"Missing sections in 10-K: {missing_sections}")
+                    # Try alternative extraction for missing sections
+                    for section in missing_sections:
+                        if not sections[section]:
+                            sections[section] = self.extract_section_alternative(
+                                text, section
+                            )
+
+            # Combine sections with priority
+            key_info = ""
+            for section_name, section_text in sections.items():
+                if section_text:
+                    key_info += f"=== {section_name.replace('_', ' ').title()} ===\n{section_text}\n\n"
+
+            # If no sections found, try to extract any relevant information
+            if not key_info.strip():
+                key_info = self.extract_any_relevant_info(text)
+
+            # Generate GPT prompt
+            prompt = (
+                f"This is a {filing['form_type']} SEC filing for {filing['ticker']} dated {filing['filing_date']}.\n\n"
+                f"Please provide a comprehensive summary covering:\n"
+                f"1. Key financial figures and performance metrics (revenue, net income, EPS, etc.)\n"
+                f"2. Business highlights and notable developments\n"
+                f"3. Significant risks and legal issues\n"
+                f"4. Major changes compared to previous periods\n\n"
+                f"Focus on specific numbers, facts, and important changes. Be analytical and concise.\n\n"
+                f"--- Filing Content Start ---\n\n{key_info}\n\n--- Filing Content End ---"
+            )
+
+            logger.debug(
+                f"Summary prompt for {filing['ticker']} {filing['form_type']}:\n{prompt}"
+            )
+
+            # Generate summary with OpenAI
+            response = get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo-16k",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=1000,
+                temperature=0.3,  # Lower temperature for more factual responses
+            )
+
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            logger.error(f"Error generating summary: {str(e)}")
+            return f"Summary generation failed: {str(e)}"
+
+    def extract_financial_data(self, text):
+        """Extract financial data using direct patterns"""
+        try:
+            financial_data = []
+
+            # Revenue patterns
+            revenue_patterns = [
+                r"(?i)(total revenue|revenue|net revenue).*?\$?\s*[\d,]+\.?\d*\s*(million|billion|thousand)?",
+                r"(?i)(revenue|net revenue).*?(increased|decreased|grew|rose|declined|fell).*?\$?\s*[\d,]+\.?\d*\s*(million|billion|thousand)?",
+            ]
+
+            # Net income patterns
+            income_patterns = [
+                r"(?i)(net income|net loss|net earnings).*?\$?\s*[\d,]+\.?\d*\s*(million|billion|thousand)?",
+                r"(?i)(net income|net loss|net earnings).*?(increased|decreased|grew|rose|declined|fell).*?\$?\s*[\d,]+\.?\d*\s*(million|billion|thousand)?",
+            ]
+
+            # EPS patterns
+            eps_patterns = [
+                r"(?i)(earnings per share|eps|diluted eps).*?\$?\s*[\d,]+\.?\d*",
+                r"(?i)(earnings per share|eps|diluted eps).*?(increased|decreased|grew|rose|declined|fell).*?\$?\s*[\d,]+\.?\d*",
+            ]
+
+            # Extract data using patterns
+            for pattern in revenue_patterns:
+                matches = re.findall(pattern, text)
+                for match in matches:
+                    if isinstance(match, tuple):
+                        financial_data.append(" ".join(match))
+                    else:
+                        financial_data.append(match)
+
+            for pattern in income_patterns:
+                matches = re.findall(pattern, text)
+                for match in matches:
+                    if isinstance(match, tuple):
+                        financial_data.append(" ".join(match))
+                    else:
+                        financial_data.append(match)
+
+            for pattern in eps_patterns:
+                matches = re.findall(pattern, text)
+                for match in matches:
+                    if isinstance(match, tuple):
+                        financial_data.append(" ".join(match))
+                    else:
+                        financial_data.append(match)
+
+            if financial_data:
+                return "=== Financial Data ===\n" + "\n".join(financial_data)
+            return None
+        except Exception as e:
+            logger.error(f"Error extracting financial data: {str(e)}")
+            return None
+
+    def extract_any_relevant_info(self, text):
+        """Extract any relevant information when no sections are found"""
+        try:
+            relevant_info = []
+
+            # Look for any financial data
+            financial_data = self.extract_financial_data(text)
+            if financial_data:
+                relevant_info.append(financial_data)
+
+            # Look for business highlights
+            business_patterns = [
+                r"(?i)(business highlights|key developments|strategic initiatives).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+                r"(?i)(acquisition|merger|partnership|agreement).*?\$?\s*[\d,]+\.?\d*\s*(million|billion|thousand)?",
+            ]
+
+            for pattern in business_patterns:
+                matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
+                for match in matches:
+                    if isinstance(match, tuple):
+                        relevant_info.append(" ".join(match))
+                    else:
+                        relevant_info.append(match)
+
+            # Look for risk factors
+            risk_patterns = [
+                r"(?i)(risk factors|principal risks).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+                r"(?i)(risks and uncertainties).*?\n(.*?)(?=\n[A-Z]|\n\n)",
+            ]
+
+            for pattern in risk_patterns:
+                matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
+                for match in matches:
+                    if isinstance(match, tuple):
+                        relevant_info.append(" ".join(match))
+                    else:
+                        relevant_info.append(match)
+
+            if relevant_info:
+                return "\n\n".join(relevant_info)
+            return text[:5000]  # Return first 5000 chars if no relevant info found
+        except Exception as e:
+            logger.error(f"Error extracting relevant info: {str(e)}")
+            return text[:5000]
+
+    def extract_sections(self, text):
+        """Extract every key section of a filing in one pass over the text"""
+        try:
+            found = extract_sections(text)
+        except Exception as e:
+            logger.error(f"Error extracting sections: {str(e)}")
+            found = {}
+
+        return {
+            section_name: (
+                self.clean_text(found[section_name]) if section_name in found else None
+            )
+            for section_name in SECTION_HEADERS
+        }
+
+    def clean_text(self, raw):
+        """Clean and normalize text"""
+        try:
+            return clean_text(raw)
+        except Exception as e:
+            logger.error(f"Error cleaning text: {str(e)}")
+            return raw
@@ -0,0 +1,180 @@
+import re
+
+from collections import deque, namedtuple
+
+Chunk = namedtuple("Chunk", ["text", "page_start", "page_end", "tokens"])
+
+# Sentence ends: ., ! or ? followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+# Words and individual punctuation marks. This undercounts WordPiece tokens
+# (rare words and numbers split into several pieces), so chunks sized for an
+# embedding model should be counted with the model's tokenizer instead
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """Approximate the number of model tokens in ``text`` without a tokenizer"""
+    return sum(1 for _ in _TOKEN.finditer(text))
+
+
+class TokenChunker:
+    """
+    Packs sentences into chunks of at most ``max_tokens`` tokens.
+
+    Consecutive chunks share up to ``overlap_tokens`` tokens of trailing
+    sentences so an answer that straddles a boundary is still retrievable.
+    Sentences longer than a whole chunk are split on word boundaries. Pages
+    are consumed one at a time and only the current chunk is held in memory,
+    so long filings are chunked in bounded space. Each chunk records the
+    first and last page its text came from.
+
+    ``count_tokens`` defaults to ``estimate_tokens``; pass the embedding
+    model's tokenizer, e.g. ``lambda text: len(tokenizer.tokenize(text))``,
+    to guarantee chunks fit its window.
+    """
+
+    def __init__(self, max_tokens=200, overlap_tokens=40, count_tokens=None):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+
+    def _sentences(self, pages):
+        for page_num, page_text in pages:
+            for sentence in _SENTENCE_END.split(page_text):
+                sentence = sentence.strip()
+                if not sentence:
+                    continue
+                tokens = self.count_tokens(sentence)
+                if tokens <= self.max_tokens:
+                    yield sentence, page_num, tokens
+                else:
+                    yield from self._split_long(sentence, page_num)
+
+    def _split_long(self, sentence, page_num):
+        words = sentence.split()
+        piece = []
+        piece_tokens = 0
+        for word in words:
+            word_tokens = self.count_tokens(word)
+            if piece and piece_tokens + word_tokens > self.max_tokens:
+                yield " ".join(piece), page_num, piece_tokens
+                piece = []
+                piece_tokens = 0
+            piece.append(word)
+            piece_tokens += word_tokens
+        if piece:
+            yield " ".join(piece), page_num, piece_tokens
+
+    def _take_words(self, sentence, max_tokens):
+        """Split ``sentence`` into leading words worth at most ``max_tokens`` and the rest"""
+        words = sentence.split()
+        taken = 0
+        for index, word in enumerate(words):
+            taken += self.count_tokens(word)
+            if taken > max_tokens:
+                return " ".join(words[:index]), " ".join(words[index:])
+        return sentence, ""
+
+    def chunk(self, pages):
+        """Yield Chunks from an iterable of (page_number, text) pairs"""
+        window = deque()
+        window_tokens = 0
+        fresh = False  # whether the window holds text not yet emitted
+
+        def emit():
+            return Chunk(
+                " ".join(sentence for sentence, _, _ in window),
+                window[0][1],
+                window[-1][1],
+                window_tokens,
+            )
+
+        for sentence, page_num, tokens in self._sentences(pages):
+            if fresh and window_tokens + tokens > self.max_tokens:
+                room = self.max_tokens - window_tokens
+                if room >= self.max_tokens // 2:
+                    # Mostly empty window: top it up with the sentence's
+                    # leading words rather than emitting a small chunk
+                    head, sentence = self._take_words(sentence, room)
+                    if head:
+                        head_tokens = self.count_tokens(head)
+                        window.append((head, page_num, head_tokens))
+                        window_tokens += head_tokens
+                        tokens = self.count_tokens(sentence)
+
+                yield emit()
+                fresh = False
+                # Keep trailing sentences as overlap, but always leave room
+                # for the incoming sentence
+                kept = 0
+                for _, _, kept_tokens in reversed(window):
+                    if kept + kept_tokens > self.overlap_tokens:
+                        break
+                    kept += kept_tokens
+                while window and (
+                    window_tokens > kept or window_tokens + tokens > self.max_tokens
+                ):
+                    window_tokens -= window.popleft()[2]
+
+            if sentence:
+                window.append((sentence, page_num, tokens))
+                window_tokens += tokens
+                fresh = True
+
+        if fresh:
+            yield emit()
+
+
+class CharacterChunker:
+    """
+    The original fixed-size chunker: about ``chunk_size`` characters per
+    chunk, cut at the last "." before the limit, with no overlap.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+
+    def chunk(self, pages):
+        """Yield Chunks from an iterable of (page_number, text) pairs"""
+        parts = []
+        length = 0
+        page_start = None
+
+        for page_num, page_text in pages:
+            if page_start is None:
+                page_start = page_num
+            parts.append(page_text + "\n")
+            length += len(page_text) + 1
+
+            if length < self.chunk_size:
+                continue
+            current = "".join(parts)
+            while len(current) >= self.chunk_size:
+                break_point = current[: self.chunk_size].rfind(".")
+                if break_point == -1:
+                    break_point = self.chunk_size
+                text = current[: break_point + 1].strip()
+                if text:
+                    yield Chunk(text, page_start, page_num, estimate_tokens(text))
+                current = current[break_point + 1 :]
+                page_start = page_num
+            parts = [current]
+            length = len(current)
+
+        text = "".join(parts).strip()
+        if text:
+            yield Chunk(text, page_start, page_num, estimate_tokens(text))
+
+
+CHUNKERS = {"tokens": TokenChunker, "characters": CharacterChunker}
+
+
+def get_chunker(name="tokens", **options):
+    """Build the chunker registered under ``name`` with the given options"""
+    if name not in CHUNKERS:
+        raise ValueError(
+            f"Unknown chunker {name!r}, expected one of {', '.join(CHUNKERS)}"
+        )
+    return CHUNKERS[name](**options)
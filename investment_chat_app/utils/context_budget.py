@@ -0,0 +1,140 @@
+import logging
+import re
+
+from functools import lru_cache
+
+from investment_chat_app.utils.chunking import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:  # optional, token counts fall back to estimate_tokens
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Tokens OpenAI adds around each chat message and to prime the reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model):
+    """Return a function counting ``model`` tokens in a string, using tiktoken when available"""
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception as e:
+            logger.warning(f"No tiktoken encoding for {model}: {str(e)}")
+    else:
+        logger.warning("tiktoken is not installed, estimating prompt tokens")
+    return estimate_tokens
+
+
+def count_message_tokens(messages, count_tokens):
+    """Number of prompt tokens a list of chat messages costs"""
+    return TOKENS_PER_REPLY + sum(
+        TOKENS_PER_MESSAGE + count_tokens(message["content"]) for message in messages
+    )
+
+
+def _normalize(text):
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def deduplicate_chunks(chunks):
+    """
+    Drop repeated chunks, keeping the best-ranked copy of each passage.
+
+    A chunk is a repeat when its id was already seen or its text is
+    contained in a kept chunk (e.g. the same filing indexed under two file
+    names). A kept chunk contained in a later one is replaced by it in place.
+    """
+    kept = []  # (normalized text, chunk) pairs
+    seen_ids = set()
+    for chunk in chunks:
+        if chunk["id"] in seen_ids:
+            continue
+        seen_ids.add(chunk["id"])
+        text = _normalize(chunk["text"])
+        if any(text in other for other, _ in kept):
+            continue
+        absorbed = [index for index, (other, _) in enumerate(kept) if other in text]
+        if absorbed:
+            kept[absorbed[0]] = (text, chunk)
+            kept = [
+                item for index, item in enumerate(kept) if index not in absorbed[1:]
+            ]
+        else:
+            kept.append((text, chunk))
+    return [chunk for _, chunk in kept]
+
+
+def join_overlapping(first, second):
+    """Concatenate two consecutive chunks, dropping the text they share"""
+    probe = second[:40]
+    start = first.find(probe) if probe else -1
+    while start != -1:
+        if second.startswith(first[start:]):
+            return first[:start] + second
+        start = first.find(probe, start + 1)
+    return f"{first} {second}"
+
+
+def merge_adjacent_chunks(chunks):
+    """
+    Join chunks that are neighbours in the same file into one passage.
+
+    Overlapping text is included once and the passage spans the pages of
+    all its parts. Passages keep the rank of their best-ranked part; chunks
+    without a ``chunk`` number in their metadata are left as they are.
+    """
+    runs = {}  # (source, chunk number) -> index of the passage ending there
+    passages = []
+    for rank, chunk in sorted(
+        enumerate(chunks),
+        key=lambda item: (
+            item[1]["metadata"].get("source", ""),
+            item[1]["metadata"].get("chunk", -1),
+        ),
+    ):
+        metadata = chunk["metadata"]
+        number = metadata.get("chunk")
+        source = metadata.get("source")
+        previous = runs.pop((source, number - 1), None) if number is not None else None
+        if previous is None:
+            passages.append([rank, dict(chunk, metadata=dict(metadata))])
+            index = len(passages) - 1
+        else:
+            index = previous
+            passage = passages[index]
+            passage[0] = min(passage[0], rank)
+            merged = passage[1]
+            merged["text"] = join_overlapping(merged["text"], chunk["text"])
+            merged["metadata"]["page_end"] = metadata.get(
+                "page_end", metadata.get("page")
+            )
+        if number is not None:
+            runs[(source, number)] = index
+
+    return [passage for _, passage in sorted(passages, key=lambda item: item[0])]
+
+
+def pack_chunks(chunks, budget, count_tokens, render):
+    """
+    Keep the best-ranked chunks whose rendered text fits in ``budget`` tokens.
+
+    Chunks that would overflow the budget are skipped so that a shorter,
+    lower-ranked one can still fit. Returns ``(chunks, tokens)``.
+    """
+    packed = []
+    used = 0
+    for chunk in chunks:
+        tokens = count_tokens(render(chunk))
+        if used + tokens > budget:
+            continue
+        packed.append(chunk)
+        used += tokens
+    return packed, used
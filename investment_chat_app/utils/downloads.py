@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from contextlib import suppress
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _fsync_directory(directory):
+    """Persist a rename by syncing its directory (a no-op where unsupported)"""
+    with suppress(OSError):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def write_atomically(chunks, path, hasher=None):
+    """
+    Stream byte ``chunks`` to ``path`` without ever exposing a partial file.
+
+    Data goes to a hidden ``.part`` file in the target directory, is fsynced
+    and then renamed over ``path``, so readers see either the previous file
+    or the complete new one; a failed download leaves ``path`` untouched.
+    ``hasher`` (e.g. from fingerprint.new_hasher) is fed every chunk.
+    Returns ``(size, hexdigest)``, with hexdigest None when no hasher is given.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".part"
+    )
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as file:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                file.write(chunk)
+                size += len(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+    _fsync_directory(directory)
+    return size, hasher.hexdigest() if hasher is not None else None
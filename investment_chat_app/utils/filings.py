@@ -0,0 +1,118 @@
+import csv
+import os
+import re
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+CONSTITUENTS_PATH = os.path.join(os.path.dirname(__file__), "constituents.csv")
+
+FORM_TYPES = ["10-K", "10-Q", "8-K", "20-F", "40-F", "6-K", "S-1", "DEF 14A"]
+
+# Forms that report on a fiscal period (amendments such as 10-K/A included)
+PERIODIC_FORM_TYPES = {"10-K", "10-Q", "20-F", "40-F"}
+
+# Names people use for companies that differ from constituents.csv
+COMPANY_ALIASES = {
+    "Amazon.com": ["AMZN"],
+    "Berkshire": ["BRK.B"],
+    "Coca Cola": ["KO"],
+    "Coke": ["KO"],
+    "Disney": ["DIS"],
+    "Eli Lilly": ["LLY"],
+    "Exxon": ["XOM"],
+    "Exxon Mobil": ["XOM"],
+    "Facebook": ["META"],
+    "Goldman": ["GS"],
+    "Google": ["GOOGL", "GOOG"],
+    "J&J": ["JNJ"],
+    "J.P. Morgan": ["JPM"],
+    "JP Morgan": ["JPM"],
+    "JPMorgan": ["JPM"],
+    "Lockheed": ["LMT"],
+    "Meta": ["META"],
+    "P&G": ["PG"],
+    "Pepsi": ["PEP"],
+    "Raytheon": ["RTX"],
+}
+
+# Legal-form suffixes dropped from company names before matching them in text
+_NAME_SUFFIX = re.compile(
+    r"(\s*\(.*?\))|,?\s+(inc\.?|incorporated|corporation|corp\.?|company|co\.?|"
+    r"plc|ltd\.?|n\.v\.|holdings?|group)$",
+    re.IGNORECASE,
+)
+
+# edgar_files/NASDAQ_AAPL_2023.pdf
+_EXCHANGE_TICKER_YEAR = re.compile(
+    r"^(?P<exchange>[A-Z]+)_(?P<ticker>[A-Z][A-Z.\-]*)_(?P<year>\d{4})\.pdf$"
+)
+# SEC_FILINGS/AAPL/2023/10-K/AAPL_10-K_2023-11-03.pdf, with "/" in the form
+# type replaced by "-" (10-K-A)
+_TICKER_FORM_DATE = re.compile(
+    r"^(?P<ticker>[A-Z][A-Z.\-]*)_(?P<form_type>[0-9A-Z][0-9A-Z \-]*)_"
+    r"(?P<date>\d{4}-\d{2}-\d{2})\.pdf$"
+)
+
+
+@lru_cache(maxsize=1)
+def load_constituents(path=CONSTITUENTS_PATH):
+    """Return the rows of constituents.csv as dicts"""
+    with open(path, "r", encoding="utf-8") as file:
+        return tuple(csv.DictReader(file))
+
+
+def normalize_company_name(name):
+    """Strip share classes and legal-form suffixes, e.g. 'Alphabet Inc. (Class A)' -> 'Alphabet'"""
+    previous = None
+    while previous != name:
+        previous = name
+        name = _NAME_SUFFIX.sub("", name).strip()
+    return name
+
+
+def fiscal_year(form_type, filing_date, period_of_report=None):
+    """
+    Fiscal year a filing reports on, taken as the year its period ends.
+
+    A 10-K filed in February 2023 for the year ended December 2022 belongs
+    to fiscal 2022. Without the period end, periodic reports are assumed to
+    be filed within 100 days of it; other forms (8-K, proxies) belong to the
+    year they were filed.
+    """
+    if period_of_report:
+        return period_of_report.year
+    # Amendments (10-K/A, or 10-K-A in file names) share the original's period
+    if form_type.split("/")[0].removesuffix("-A") in PERIODIC_FORM_TYPES:
+        return (filing_date - timedelta(days=100)).year
+    return filing_date.year
+
+
+def parse_document_name(filename):
+    """
+    Extract ticker, form type and years from an indexed PDF's file name.
+
+    Returns a dict with whichever of ``ticker``, ``form_type``,
+    ``fiscal_year`` and ``filing_year`` (ints) the name encodes, suitable
+    for ChromaDB chunk metadata. edgar_files names carry the fiscal year;
+    downloaded filings carry the filing date, from which the fiscal year is
+    estimated.
+    """
+    basename = os.path.basename(filename)
+    match = _TICKER_FORM_DATE.match(basename)
+    if match:
+        form_type = match.group("form_type")
+        filing_date = date.fromisoformat(match.group("date"))
+        return {
+            "ticker": match.group("ticker"),
+            "form_type": form_type,
+            "fiscal_year": fiscal_year(form_type, filing_date),
+            "filing_year": filing_date.year,
+        }
+    match = _EXCHANGE_TICKER_YEAR.match(basename)
+    if match:
+        return {
+            "ticker": match.group("ticker"),
+            "fiscal_year": int(match.group("year")),
+        }
+    return {}
@@ -0,0 +1,57 @@
+import hashlib
+import logging
+import os
+
+from collections import namedtuple
+from django.conf import settings
+
+try:
+    import xxhash
+except ImportError:  # optional, only needed for DOCUMENT_HASH_ALGORITHM="xxhash"
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+Fingerprint = namedtuple("Fingerprint", ["hash", "size", "mtime"])
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def new_hasher(algorithm=None):
+    """Return a fresh hasher for ``algorithm``, DOCUMENT_HASH_ALGORITHM by default"""
+    algorithm = algorithm or settings.DOCUMENT_HASH_ALGORITHM
+    if algorithm == "xxhash":
+        if xxhash is not None:
+            return xxhash.xxh3_128()
+        logger.warning("xxhash is not installed, falling back to blake2b")
+        algorithm = "blake2b"
+    return hashlib.new(algorithm)
+
+
+def calculate_file_hash(file_path, algorithm=None):
+    """Calculate a content hash of a file to detect changes"""
+    hasher = new_hasher(algorithm)
+    with open(file_path, "rb") as f:
+        buf = f.read(HASH_CHUNK_SIZE)
+        while len(buf) > 0:
+            hasher.update(buf)
+            buf = f.read(HASH_CHUNK_SIZE)
+    return hasher.hexdigest()
+
+
+def fingerprint_file(file_path, known=None):
+    """
+    Fingerprint a file, only rehashing it when its size or mtime has changed.
+
+    ``known`` is a previously recorded entry with ``hash``, ``size`` and
+    ``mtime`` keys, such as a row from get_processed_files().
+    """
+    stat = os.stat(file_path)
+    if (
+        known
+        and known.get("hash")
+        and known.get("size") == stat.st_size
+        and known.get("mtime") == stat.st_mtime
+    ):
+        return Fingerprint(known["hash"], stat.st_size, stat.st_mtime)
+    return Fingerprint(calculate_file_hash(file_path), stat.st_size, stat.st_mtime)
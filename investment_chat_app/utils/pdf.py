@@ -0,0 +1,35 @@
+import logging
+import time
+
+import PyPDF2
+from PyPDF2 import PdfReader
+
+logger = logging.getLogger(__name__)
+
+# Part of the page text cache key; bump the suffix when extraction changes
+EXTRACTOR_VERSION = f"PyPDF2-{PyPDF2.__version__}-1"
+
+
+def iter_pdf_pages(file_path):
+    """Yield (page_number, text) for every page of a PDF, skipping unreadable pages"""
+    with open(file_path, "rb") as file:
+        pdf_reader = PdfReader(file)
+        for page_num, page in enumerate(pdf_reader.pages):
+            try:
+                yield page_num + 1, page.extract_text() or ""
+            except Exception as e:
+                logger.error(
+                    f"Error extracting page {page_num + 1} of {file_path}: {str(e)}"
+                )
+
+
+def extract_pdf_pages(file_path):
+    """
+    Extract the text of every page of a PDF.
+
+    Kept free of Django and ChromaDB imports so it can run in ingestion worker
+    processes. Returns the pages together with the seconds spent extracting.
+    """
+    started = time.perf_counter()
+    pages = list(iter_pdf_pages(file_path))
+    return pages, time.perf_counter() - started
@@ -0,0 +1,138 @@
+import re
+
+from collections import namedtuple
+from functools import lru_cache
+
+from investment_chat_app.utils.filings import (
+    COMPANY_ALIASES,
+    FORM_TYPES,
+    load_constituents,
+    normalize_company_name,
+)
+
+QueryFilters = namedtuple("QueryFilters", ["tickers", "years", "form_types"])
+
+# Tickers that are also everyday words or acronyms; in a question they only
+# count when written with a leading "$" (e.g. "$NOW")
+AMBIGUOUS_TICKERS = set(
+    "ALL ARE CAT COST DAY DE ED EL ES FAST GEN HAS ICE IT KEY LOW MA NOW ON PM "
+    "POOL SO TAP TECH WELL".split()
+)
+
+_TICKER_TOKEN = re.compile(r"(?<![\w$])(\$)?([A-Za-z]{1,5}(?:\.[A-Za-z])?)(?![\w.])")
+_YEAR = re.compile(r"\b(?:fy\s?)?((?:19|20)\d{2})\b", re.IGNORECASE)
+# "10-K", "10K" and "10 K" all count
+_FORM_TYPE = re.compile(
+    r"\b("
+    + "|".join(
+        re.escape(f).replace(r"\-", r"[-\s]?").replace(r"\ ", r"\s?")
+        for f in FORM_TYPES
+    )
+    + r")\b",
+    re.IGNORECASE,
+)
+_FORM_ALIASES = {
+    "annual report": "10-K",
+    "quarterly report": "10-Q",
+    "current report": "8-K",
+    "proxy statement": "DEF 14A",
+}
+
+
+@lru_cache(maxsize=1)
+def _company_index():
+    """Ticker set and compiled company-name pattern built from constituents.csv and COMPANY_ALIASES"""
+    tickers = set()
+    names = {}
+    for row in load_constituents():
+        ticker = row.get("Symbol")
+        if not ticker:
+            continue
+        tickers.add(ticker)
+        name = normalize_company_name(row.get("Security", ""))
+        if len(name) >= 3:
+            names.setdefault(name.lower(), []).append(ticker)
+    for alias, alias_tickers in COMPANY_ALIASES.items():
+        known = [ticker for ticker in alias_tickers if ticker in tickers]
+        if known:
+            names.setdefault(alias.lower(), known)
+
+    # Longest names first so "American Express" wins over "American"
+    pattern = re.compile(
+        r"\b("
+        + "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+        + r")(?:['’]s)?\b",
+        re.IGNORECASE,
+    )
+    return tickers, names, pattern
+
+
+def find_tickers(query):
+    """Tickers mentioned in ``query`` by symbol (e.g. AAPL, $aapl) or company name"""
+    tickers, names, name_pattern = _company_index()
+    found = []
+
+    for dollar, token in _TICKER_TOKEN.findall(query):
+        symbol = token.upper()
+        if symbol not in tickers:
+            continue
+        if dollar or (
+            token.isupper() and len(symbol) > 1 and symbol not in AMBIGUOUS_TICKERS
+        ):
+            found.append(symbol)
+
+    for match in name_pattern.finditer(query):
+        text = match.group(1)
+        # Single-word names like "Apple" or "Target" must be capitalized
+        if " " not in text and not text[0].isupper():
+            continue
+        found.extend(names[text.lower()])
+
+    return list(dict.fromkeys(found))
+
+
+def find_years(query):
+    """Four-digit years (optionally written FY2023) mentioned in ``query``, read as fiscal years"""
+    return sorted({int(year) for year in _YEAR.findall(query)})
+
+
+def find_form_types(query):
+    """SEC form types mentioned in ``query``, by number or by name"""
+    found = []
+    for match in _FORM_TYPE.findall(query):
+        normalized = re.sub(r"[-\s]", "", match.upper())
+        found.extend(f for f in FORM_TYPES if re.sub(r"[-\s]", "", f) == normalized)
+    lowered = query.lower()
+    found.extend(form for alias, form in _FORM_ALIASES.items() if alias in lowered)
+    return list(dict.fromkeys(found))
+
+
+def analyze_query(query):
+    """Detect the tickers, years and form types a question is about"""
+    return QueryFilters(find_tickers(query), find_years(query), find_form_types(query))
+
+
+def _condition(field, values):
+    return {field: values[0]} if len(values) == 1 else {field: {"$in": values}}
+
+
+def build_where_filter(filters, fields=("tickers", "years", "form_types")):
+    """
+    Turn QueryFilters into a ChromaDB ``where`` clause, or None if empty.
+
+    Only the given ``fields`` are used, so callers can relax a filter by
+    dropping e.g. the year while keeping the ticker.
+    """
+    metadata_keys = {
+        "tickers": "ticker",
+        "years": "fiscal_year",
+        "form_types": "form_type",
+    }
+    conditions = [
+        _condition(metadata_keys[field], getattr(filters, field))
+        for field in fields
+        if getattr(filters, field)
+    ]
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
@@ -0,0 +1,137 @@
+import re
+
+# Header phrases for each summary section. A phrase may belong to several
+# sections (e.g. Item 7 opens both the business overview and the financial
+# condition discussion). Spaces match any run of whitespace, including none,
+# because PyPDF2 often drops the spaces between words.
+SECTION_HEADERS = {
+    "financial_highlights": [
+        r"item 6\.? selected financial data",
+        r"item 8\.? financial statements",
+        "financial highlights",
+        "selected financial data",
+        "consolidated statements of operations",
+    ],
+    "business_overview": [
+        r"item 1\.? business",
+        r"item 7\.? management's discussion and analysis",
+        "business overview",
+        "management's discussion",
+        "executive summary",
+    ],
+    "risk_factors": [
+        r"item 1a\.? risk factors",
+        "risk factors",
+        "risk and uncertainties",
+    ],
+    "financial_condition": [
+        r"item 7\.? management's discussion and analysis",
+        "financial condition",
+        "results of operations",
+        "liquidity and capital resources",
+    ],
+    "legal_proceedings": [r"item 3\.? legal proceedings", "legal proceedings"],
+    "market_risk": [
+        r"item 7a\.? quantitative and qualitative disclosures about market risk",
+        "market risk",
+    ],
+    "controls": [r"item 9a\.? controls and procedures", "controls and procedures"],
+    "executive_compensation": [
+        r"item 11\.? executive compensation",
+        "executive compensation",
+    ],
+    "security_ownership": [r"item 12\.? security ownership", "security ownership"],
+    "related_party_transactions": [
+        r"item 13\.? (?:certain relationships and )?related (?:party )?transactions",
+        "related party transactions",
+    ],
+}
+
+
+def _phrase_pattern(phrase):
+    return phrase.replace(" ", r"\s*").replace("'", "['’]")
+
+
+class SectionSegmenter:
+    """
+    Locates filing sections with one compiled alternation of every header.
+
+    ``find`` scans the text once and returns, for each section, the span from
+    its first header to the next header of any section, replacing a separate
+    regex search per section plus one per possible following header. The scan
+    runs case-sensitively over a lowercased copy of the text, which is several
+    times faster than ``re.IGNORECASE``, and stops once every section is closed.
+    """
+
+    def __init__(self, headers=SECTION_HEADERS):
+        self.headers = headers
+        phrases = {}
+        for section, section_phrases in headers.items():
+            for phrase in section_phrases:
+                phrases.setdefault(phrase, []).append(section)
+
+        # Longest first so "item 1a. risk factors" wins over "risk factors"
+        ordered = sorted(phrases, key=len, reverse=True)
+        self._phrases = [
+            (re.compile(_phrase_pattern(phrase.lower())), phrases[phrase])
+            for phrase in ordered
+        ]
+        # Named groups would say which header matched, but make the scan an
+        # order of magnitude slower, so headers are identified afterwards
+        alternation = "|".join(
+            f"(?:{_phrase_pattern(phrase.lower())})" for phrase in ordered
+        )
+        self.pattern = re.compile(alternation)
+        self.ignorecase_pattern = re.compile(alternation, re.IGNORECASE)
+
+    def _sections_for(self, header):
+        header = header.lower()
+        for phrase_pattern, sections in self._phrases:
+            if phrase_pattern.fullmatch(header):
+                return sections
+        return []
+
+    def find(self, text):
+        """Return {section: (start, end)} for every section whose header occurs"""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self.pattern.finditer(lowered)
+        else:
+            # A few characters lowercase to more than one, which would shift
+            # offsets, so fall back to matching the original text
+            matches = self.ignorecase_pattern.finditer(text)
+
+        spans = {}
+        pending = []
+        for match in matches:
+            # The previous header's section(s) end where this header starts
+            for section in pending:
+                spans[section] = (spans[section][0], match.start())
+            pending = []
+            for section in self._sections_for(match.group()):
+                if section not in spans:
+                    spans[section] = (match.start(), len(text))
+                    pending.append(section)
+            if not pending and len(spans) == len(self.headers):
+                break
+        return spans
+
+    def extract(self, text):
+        """Return {section: text} for every section whose header occurs"""
+        return {
+            section: text[start:end].strip()
+            for section, (start, end) in self.find(text).items()
+        }
+
+
+default_segmenter = SectionSegmenter()
+
+
+def find_sections(text):
+    """Section spans of ``text`` using the default 10-K header set"""
+    return default_segmenter.find(text)
+
+
+def extract_sections(text):
+    """Section texts of ``text`` using the default 10-K header set"""
+    return default_segmenter.extract(text)
@@ -0,0 +1,104 @@
+import hashlib
+import re
+import threading
+
+from collections import OrderedDict
+
+# Patterns shared by every text cleaning path, compiled once at import. The
+# leading lookaheads let the case-insensitive patterns skip most positions
+# with a single character class test.
+_HEADER_LINE = re.compile(
+    r"(?=[pPtTsSfF])(?:page|table of contents|sec filing|form \d+-\w+).*?\n",
+    re.IGNORECASE,
+)
+_WHITESPACE_RUN = re.compile(r"\s{2,}")
+_CONTROL_CHARS = re.compile(r"[\x00-\x1F\x7F-\x9F]")
+_CONTROL_CHARS_EXCEPT_WHITESPACE = re.compile(r"[\x00-\x08\x0E-\x1B\x7F-\x84\x86-\x9F]")
+_DOT_RUN = re.compile(r"\.{2,}")
+# URLs and then email addresses, in a single pass
+_URL_OR_EMAIL = re.compile(
+    r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
+    r"|[\w\.-]+@[\w\.-]+\.\w+"
+)
+# Page numbers and form numbers, in a single pass
+_PAGE_OR_FORM_NUMBER = re.compile(r"(?=[pPfF])(?:page \d+|form \d+-\w+)", re.IGNORECASE)
+
+
+def normalize_whitespace(text):
+    """Drop control characters and collapse whitespace runs to a single space"""
+    return _WHITESPACE_RUN.sub(" ", _CONTROL_CHARS_EXCEPT_WHITESPACE.sub("", text))
+
+
+def clean_text(raw):
+    """
+    Clean and normalize text for summarization.
+
+    Removes header and footer lines, control characters, repeated dots, URLs,
+    email addresses and page or form numbers. Control characters include
+    newlines, so the result is a single line.
+    """
+    cleaned = _HEADER_LINE.sub("", raw)
+    cleaned = _WHITESPACE_RUN.sub(" ", cleaned)
+    cleaned = _CONTROL_CHARS.sub("", cleaned)
+    cleaned = _DOT_RUN.sub(".", cleaned)
+    if "@" in cleaned or "http" in cleaned:
+        cleaned = _URL_OR_EMAIL.sub("", cleaned)
+    cleaned = _PAGE_OR_FORM_NUMBER.sub("", cleaned)
+    return cleaned.strip()
+
+
+def clean_document(pages, clean_page=clean_text):
+    """
+    Clean the text of every page and assemble the document.
+
+    ``pages`` is an iterable of page texts; empty pages are skipped. Header
+    lines left after per-page cleaning are removed page by page, before the
+    pages are joined, and the whole document is collapsed to a single line.
+    Returns None when no page has any text.
+    """
+    parts = [_HEADER_LINE.sub("", clean_page(text) + "\n\n") for text in pages if text]
+    text = "".join(parts)
+    if not text.strip():
+        return None
+
+    text = _WHITESPACE_RUN.sub(" ", text)
+    text = _CONTROL_CHARS.sub("", text)
+    text = _DOT_RUN.sub(".", text)
+    return text.strip()
+
+
+class PageCleaner:
+    """
+    Applies a cleaning function to page text, memoizing results by page hash.
+
+    Filings repeat boilerplate pages (cover pages, signatures, exhibit
+    indexes), so a small LRU avoids cleaning the same page twice. With
+    ``memo_size=0`` it simply calls ``clean``.
+    """
+
+    def __init__(self, clean=clean_text, memo_size=0):
+        self.clean = clean
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, text):
+        if not self.memo_size:
+            return self.clean(text)
+
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return self._memo[key]
+            self.misses += 1
+
+        cleaned = self.clean(text)
+        with self._lock:
+            self._memo[key] = cleaned
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return cleaned
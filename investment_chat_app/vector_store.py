@@ -0,0 +1,252 @@
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+from investment_chat_app.answer_cache import get_answer_cache
+from investment_chat_app.document_inventory import bump_inventory_version
+from investment_chat_app.embeddings import (
+    ServiceEmbeddingFunction,
+    get_embedding_service,
+)
+from investment_chat_app.models import IndexedDocument
+from investment_chat_app.utils.filings import parse_document_name
+
+logger = logging.getLogger(__name__)
+
+_chroma_client = None
+_collection = None
+_collection_lock = threading.Lock()
+
+
+def _open_chroma_client():
+    """
+    Connect to the ChromaDB server, or open an embedded store when no
+    CHROMA_HOST is configured.
+
+    The web app and the indexing worker must share one server: embedded
+    stores are per process and never see each other's writes.
+    """
+    import chromadb
+
+    if settings.CHROMA_HOST:
+        client_settings = None
+        if settings.CHROMA_AUTH_TOKEN:
+            client_settings = chromadb.config.Settings(
+                chroma_client_auth_provider="chromadb.auth.token_authn.TokenAuthClientProvider",
+                chroma_client_auth_credentials=settings.CHROMA_AUTH_TOKEN,
+            )
+        client = chromadb.HttpClient(
+            host=settings.CHROMA_HOST,
+            port=settings.CHROMA_PORT,
+            ssl=settings.CHROMA_SSL,
+            settings=client_settings,
+        )
+        logger.info(
+            f"Connected to ChromaDB server at {settings.CHROMA_HOST}:{settings.CHROMA_PORT}"
+        )
+        return client
+
+    # Set up ChromaDB with persistent storage
+    db_path = os.path.join(settings.BASE_DIR, "chromadb_data")
+    os.makedirs(db_path, exist_ok=True)
+    logger.warning(
+        "CHROMA_HOST is not set, using embedded ChromaDB storage; index and "
+        "serve chat from the same process or writes will not be visible"
+    )
+    return chromadb.PersistentClient(path=db_path)
+
+
+def get_collection():
+    """Return the edgar_documents collection, connecting to ChromaDB on first use"""
+    global _chroma_client, _collection
+    if _collection is None:
+        with _collection_lock:
+            if _collection is None:
+                try:
+                    _chroma_client = _open_chroma_client()
+                    _collection = _chroma_client.get_or_create_collection(
+                        name="edgar_documents",
+                        embedding_function=ServiceEmbeddingFunction(
+                            get_embedding_service()
+                        ),
+                    )
+                    logger.info("ChromaDB collection initialized successfully")
+                except Exception as e:
+                    logger.error(f"Failed to initialize ChromaDB: {str(e)}")
+                    raise
+    return _collection
+
+
+def get_all_documents_summary():
+    """Get a summary of all documents in the collection from the file manifest"""
+    try:
+        file_details = {
+            doc.source: {
+                "processed_date": doc.processed_date.isoformat(),
+                "total_pages": doc.page_count,
+            }
+            for doc in IndexedDocument.objects.order_by("source")
+        }
+
+        logger.info(f"Found {len(file_details)} unique documents in collection")
+        for file in file_details:
+            logger.info(f"Document: {file}, Pages: {file_details[file]['total_pages']}")
+
+        return file_details
+    except Exception as e:
+        logger.error(f"Error getting documents summary: {str(e)}")
+        return {}
+
+
+def get_file_metadata(filename):
+    """Get metadata for a processed file"""
+    try:
+        results = get_collection().get(where={"source": filename}, limit=1)
+        if results and results["metadatas"]:
+            return results["metadatas"][0]
+        return None
+    except Exception as e:
+        logger.error(f"Error getting file metadata: {str(e)}")
+        return None
+
+
+def get_processed_files():
+    """Get list of files that have already been processed"""
+    try:
+        return {
+            doc.source: {
+                "hash": doc.file_hash,
+                "size": doc.file_size,
+                "mtime": doc.file_mtime,
+                "processed_date": doc.processed_date.isoformat(),
+            }
+            for doc in IndexedDocument.objects.all()
+        }
+    except Exception as e:
+        logger.error(f"Error getting processed files: {str(e)}")
+        return {}
+
+
+def record_indexed_file(
+    filename, file_hash, file_size, file_mtime, page_count, chunk_count
+):
+    """Create or update the manifest entry for a file that was just indexed"""
+    IndexedDocument.objects.update_or_create(
+        source=filename,
+        defaults={
+            "file_hash": file_hash,
+            "file_size": file_size,
+            "file_mtime": file_mtime,
+            "page_count": page_count,
+            "chunk_count": chunk_count,
+            "processed_date": timezone.now(),
+        },
+    )
+    bump_inventory_version()
+
+
+def rebuild_manifest_from_collection():
+    """
+    Populate the file manifest from chunk metadata already stored in ChromaDB.
+
+    Only needed once for collections indexed before the manifest existed, so
+    this is the one place that still scans every chunk's metadata.
+    """
+    try:
+        existing_docs = get_collection().get(include=["metadatas"])
+    except Exception as e:
+        logger.error(f"Error rebuilding file manifest: {str(e)}")
+        return 0
+
+    files = {}
+    for metadata in existing_docs.get("metadatas", []):
+        if not metadata or "source" not in metadata:
+            continue
+        entry = files.setdefault(
+            metadata["source"],
+            {"file_hash": metadata.get("file_hash", ""), "pages": 0, "chunks": 0},
+        )
+        entry["pages"] = max(
+            entry["pages"], metadata.get("page_end", metadata.get("page", 0))
+        )
+        entry["chunks"] += 1
+
+    for filename, entry in files.items():
+        IndexedDocument.objects.update_or_create(
+            source=filename,
+            defaults={
+                "file_hash": entry["file_hash"],
+                "page_count": entry["pages"],
+                "chunk_count": entry["chunks"],
+                "processed_date": timezone.now(),
+            },
+        )
+
+    bump_inventory_version()
+    logger.info(f"Rebuilt file manifest for {len(files)} documents")
+    return len(files)
+
+
+def backfill_fiscal_years(batch_size=500):
+    """
+    Add ``fiscal_year``/``filing_year`` to chunks indexed with only ``year``.
+
+    Older chunks stored a single ``year`` that was the fiscal year for
+    edgar_files but the filing year for downloaded filings; questions are
+    now matched against ``fiscal_year``. Returns the number of chunks updated.
+    """
+    collection = get_collection()
+    updated = 0
+    offset = 0
+    while True:
+        results = collection.get(
+            where={"year": {"$gt": 0}},
+            include=["metadatas"],
+            limit=batch_size,
+            offset=offset,
+        )
+        if not results["ids"]:
+            return updated
+        offset += len(results["ids"])
+
+        ids, metadatas = [], []
+        for chunk_id, metadata in zip(results["ids"], results["metadatas"]):
+            if "fiscal_year" in metadata:
+                continue
+            years = {
+                key: value
+                for key, value in parse_document_name(metadata["source"]).items()
+                if key in ("fiscal_year", "filing_year")
+            }
+            if years:
+                ids.append(chunk_id)
+                metadatas.append({**metadata, **years})
+        if ids:
+            collection.update(ids=ids, metadatas=metadatas)
+            updated += len(ids)
+            logger.info(f"Backfilled fiscal years for {updated} chunks")
+
+
+def remove_file_from_collection(filename):
+    """
+    Remove all chunks of a specific file from the collection.
+
+    The manifest row is only deleted once the chunks are gone, so a failed
+    delete leaves the file listed and reconciliation can try again.
+    """
+    try:
+        results = get_collection().get(where={"source": filename}, include=[])
+        if results and results["ids"]:
+            get_collection().delete(ids=results["ids"])
+        IndexedDocument.objects.filter(source=filename).delete()
+        bump_inventory_version()
+        get_answer_cache().invalidate_source(filename)
+        if results and results["ids"]:
+            logger.info(f"Removed {filename} from collection")
+            return True
+    except Exception as e:
+        logger.error(f"Error removing file {filename}: {str(e)}")
+    return False
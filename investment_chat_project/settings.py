@@ -187,8 +187,133 @@ LOGGING = {
 POLYGON_API_KEY = os.environ.get("POLYGON_API_KEY")
 POLYGON_BASE_URL = os.environ.get("POLYGON_BASE_URL")
 
+# ChromaDB server shared by the web app and the indexing worker. Without
+# CHROMA_HOST an embedded store in chromadb_data is used, which only works when
+# a single process both indexes and serves chat (local development).
+CHROMA_HOST = os.environ.get("CHROMA_HOST")
+CHROMA_PORT = int(os.environ.get("CHROMA_PORT", 8000))
+CHROMA_SSL = os.environ.get("CHROMA_SSL", "false").lower() == "true"
+CHROMA_AUTH_TOKEN = os.environ.get("CHROMA_AUTH_TOKEN")
+
 SEC_API_KEY = os.environ.get("SEC_API_KEY")
-SEC_API_URL = os.environ.get("SEC_API_URL")
-PDF_CONV_URL = os.environ.get("PDF_CONV_URL")
+SEC_API_URL = os.environ.get("SEC_API_URL", "https://api.sec-api.io")
+PDF_CONV_URL = os.environ.get("PDF_CONV_URL", "https://api.sec-api.io/filing-reader")
+
+# SEC downloads: tickers fetched in parallel, shared request rate (requests per
+# second, with bursts of up to SEC_API_BURST) and retries of 429/5xx responses
+# with exponential backoff starting at SEC_API_BACKOFF_SECONDS
+SEC_DOWNLOAD_CONCURRENCY = int(os.environ.get("SEC_DOWNLOAD_CONCURRENCY", 8))
+SEC_API_RATE_LIMIT = float(os.environ.get("SEC_API_RATE_LIMIT", 5))
+SEC_API_BURST = int(os.environ.get("SEC_API_BURST", 10))
+SEC_API_MAX_RETRIES = int(os.environ.get("SEC_API_MAX_RETRIES", 5))
+SEC_API_BACKOFF_SECONDS = float(os.environ.get("SEC_API_BACKOFF_SECONDS", 1.0))
+SEC_API_TIMEOUT = float(os.environ.get("SEC_API_TIMEOUT", 60))
+
+# Filings requested per search page; sec-api serves at most 50
+SEC_API_PAGE_SIZE = int(os.environ.get("SEC_API_PAGE_SIZE", 50))
+
+# Downloaded filings upserted per database transaction
+SEC_FILINGS_BATCH_SIZE = int(os.environ.get("SEC_FILINGS_BATCH_SIZE", 200))
+
+# Hash used to fingerprint indexed documents: md5, blake2b, sha256 or xxhash.
+# Changing it re-indexes every file whose size or mtime changes afterwards.
+DOCUMENT_HASH_ALGORITHM = os.environ.get("DOCUMENT_HASH_ALGORITHM", "md5")
+
+# Document ingestion pipeline: extraction processes, files extracted ahead of
+# the single ChromaDB writer, and chunks per collection.add() call
+INDEXING_WORKERS = int(os.environ.get("INDEXING_WORKERS", os.cpu_count() or 1))
+INDEXING_MAX_PENDING = int(os.environ.get("INDEXING_MAX_PENDING", 2 * INDEXING_WORKERS))
+INDEXING_BATCH_SIZE = int(os.environ.get("INDEXING_BATCH_SIZE", 20))
+
+# Downloaded filings queued for indexing: jobs claimed per pass, seconds after
+# which a job left running by a crashed worker is re-queued, and attempts made
+# before a failed job is left failed
+INGESTION_QUEUE_BATCH_SIZE = int(os.environ.get("INGESTION_QUEUE_BATCH_SIZE", 20))
+INGESTION_JOB_TIMEOUT = int(os.environ.get("INGESTION_JOB_TIMEOUT", 30 * 60))
+INGESTION_MAX_ATTEMPTS = int(os.environ.get("INGESTION_MAX_ATTEMPTS", 3))
+
+# Document chunking: "tokens" packs sentences up to CHUNK_MAX_TOKENS, counted
+# with the embedding model's tokenizer and capped at its window (256 for
+# MiniLM), with CHUNK_OVERLAP_TOKENS of overlap; "characters" is the original
+# 1000-character chunker
+CHUNKER = os.environ.get("CHUNKER", "tokens")
+CHUNK_MAX_TOKENS = int(os.environ.get("CHUNK_MAX_TOKENS", 200))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", 40))
+
+# Load the embedding model, ChromaDB and OpenAI client in each gunicorn worker
+# after it forks (see gunicorn.conf.py) instead of on the first chat request
+WARM_UP_ON_START = os.environ.get("WARM_UP_ON_START", "false").lower() == "true"
+
+# Shared embedding service used for indexing, retrieval and summaries
+EMBEDDING_MODEL_NAME = os.environ.get("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_BATCH_WAIT_MS = float(os.environ.get("EMBEDDING_BATCH_WAIT_MS", 5))
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", 50000))
+EMBEDDING_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH", os.path.join(BASE_DIR, "cache", "embeddings.sqlite3")
+)
+
+# Downloaded SEC filing PDFs. The indexing worker reads queued files from
+# here, so sec_filings must run where this directory is shared with it
+SEC_FILINGS_DIR = os.environ.get(
+    "SEC_FILINGS_DIR", os.path.join(BASE_DIR, "investment_chat_app", "SEC_FILINGS")
+)
+
+# Extracted PDF page text, keyed by file hash and extractor version
+PAGE_TEXT_CACHE_PATH = os.environ.get(
+    "PAGE_TEXT_CACHE_PATH", os.path.join(BASE_DIR, "cache", "pages.sqlite3")
+)
+
+# Hybrid retrieval: BM25 over the same chunks, fused with vector results by
+# reciprocal rank (HYBRID_RRF_K); each web process re-checks the file manifest
+# for indexer changes every LEXICAL_INDEX_REFRESH_SECONDS
+HYBRID_RETRIEVAL = os.environ.get("HYBRID_RETRIEVAL", "true").lower() == "true"
+HYBRID_RRF_K = int(os.environ.get("HYBRID_RRF_K", 60))
+LEXICAL_INDEX_REFRESH_SECONDS = int(os.environ.get("LEXICAL_INDEX_REFRESH_SECONDS", 30))
+
+# Prompt tokens spent on retrieved context; passages are packed best-ranked
+# first after dropping duplicates and joining neighbouring chunks
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.environ.get("CHAT_CONTEXT_TOKEN_BUDGET", 3000))
+
+# Django cache, shared by the web workers and the indexing worker so inventory
+# invalidations reach every process: Redis when REDIS_URL is set, otherwise a
+# database table created with `python manage.py createcachetable`
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+
+# Indexed-document inventory, cached per process and in the Django cache and
+# invalidated whenever ingestion adds or removes files; the TTL bounds how long
+# a process can miss an invalidation, e.g. while the cache is unreachable
+DOCUMENT_INVENTORY_TTL = int(os.environ.get("DOCUMENT_INVENTORY_TTL", 300))
+
+# Threads available to the async chat path for ChromaDB, embedding and ORM calls
+CHAT_THREAD_POOL_SIZE = int(os.environ.get("CHAT_THREAD_POOL_SIZE", 32))
+
+# Semantic answer cache for process_message (disable it to load test the
+# uncached chat path)
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.environ.get("ANSWER_CACHE_THRESHOLD", 0.95))
+ANSWER_CACHE_MAX_ENTRIES = int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", 1000))
+ANSWER_CACHE_TTL = int(os.environ.get("ANSWER_CACHE_TTL", 60 * 60))
+
+# Number of cleaned pages memoized by page hash (0 disables memoization)
+TEXT_CLEAN_MEMO_SIZE = int(os.environ.get("TEXT_CLEAN_MEMO_SIZE", 0))
+
+# Page sizes for the /api/forms/ filings listing
+FILINGS_PAGE_SIZE = int(os.environ.get("FILINGS_PAGE_SIZE", 100))
+FILINGS_MAX_PAGE_SIZE = int(os.environ.get("FILINGS_MAX_PAGE_SIZE", 1000))
 
 django_heroku.settings(locals())
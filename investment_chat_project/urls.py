@@ -24,6 +24,16 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("", views.home, name="home"),
     path("process_message/", views.process_message, name="process_message"),
+    path(
+        "process_message/async/",
+        views.process_message_async,
+        name="process_message_async",
+    ),
+    path(
+        "process_message/stream/",
+        views.process_message_stream,
+        name="process_message_stream",
+    ),
     path("api/", include("polygon_ai.urls")),
     path("api/auth/", include("signup.urls")),
     path("api/", include("investment_chat_app.urls")),